@@ -0,0 +1,95 @@
+# Requests/sec and latency percentiles of the HTTP API over keep-alive
+# connections.
+#
+#   python -m benchmarks.bench_api --clients 8 --requests 4000
+#   python -m benchmarks.bench_api --url http://127.0.0.1:8600 --endpoint pdf
+#
+# Without --url an in-process threaded server is started on a free port.
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.bench_concurrency import make_rows
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def build_request(endpoint, row, is_premium):
+    name, dob, city = row
+    params = {'name': name, 'dob': dob, 'city': city, 'premium': int(is_premium)}
+    if endpoint == 'batch':
+        body = json.dumps({'rows': [{'name': name, 'dob': dob, 'city': city}] * 100, 'premium': is_premium})
+        return 'POST', '/v1/insights/batch', body.encode('utf-8')
+    return 'GET', f"/v1/{endpoint}?{urlencode(params)}", None
+
+
+def client(host, port, requests, latencies, errors):
+    conn = http.client.HTTPConnection(host, port)
+    for method, path, body in requests:
+        start = time.perf_counter()
+        headers = {'Accept-Encoding': 'gzip'}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status != 200:
+            errors.append(response.status)
+    conn.close()
+
+
+def run(host, port, endpoint, clients, total, is_premium, unique):
+    rows = make_rows(unique)
+    requests = [build_request(endpoint, rows[i % unique], is_premium) for i in range(total)]
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(host, port, requests[i::clients], latencies, errors))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, statistics.median(latencies), percentile(latencies, 0.99), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP API load benchmark')
+    parser.add_argument('--url', default=None)
+    parser.add_argument('--endpoint', choices=['insights', 'batch', 'pdf'], default='insights')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--unique', type=int, default=1000, help='distinct inputs (the rest are cache hits)')
+    parser.add_argument('--free', action='store_true')
+    args = parser.parse_args()
+    
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        from insights.api import make_server
+        server = make_server('127.0.0.1', 0)
+        host, port = server.server_address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    try:
+        rps, p50, p99, errors = run(host, port, args.endpoint, args.clients, args.requests,
+                                    not args.free, args.unique)
+    finally:
+        if server is not None:
+            server.shutdown()
+    print(f"{args.endpoint:8} clients={args.clients:<3} {rps:8.0f} req/s   p50 {p50:6.2f} ms   "
+          f"p99 {p99:6.2f} ms   errors={len(errors)}")
+
+
+if __name__ == '__main__':
+    main()
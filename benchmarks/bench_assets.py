@@ -0,0 +1,57 @@
+# Styling cost per rerun: the old inline <style> block with Google Fonts
+# @imports vs the minified, self-hosted stylesheet inlined now.
+#
+#   python -m benchmarks.bench_assets
+#
+# Reports the bytes re-sent over the websocket on every rerun, the number
+# of render-blocking third-party requests, and the one-off (cacheable)
+# font downloads from Streamlit's static folder. The stylesheet itself is
+# not a separate download: Streamlit 1.29 serves .css as text/plain with
+# nosniff, which browsers refuse as a stylesheet. For paint timings in a
+# real browser, run the app with INSIGHTS_PAINT_TIMING=1 and read the
+# "[insights] paint" line in the console. Fails when a font
+# static/app.css refers to is missing, since the page would then fall
+# back to a system font.
+import os
+import re
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from insights.assets import CSS_SOURCE, FONT_DIR, missing_fonts, stylesheet_tag
+
+GOOGLE_IMPORTS = (
+    "@import url('https://fonts.googleapis.com/css2?family=Noto+Naskh+Arabic:wght@400;500;600;700&display=swap');\n"
+    "@import url('https://fonts.googleapis.com/css2?family=Amiri:wght@400;700&display=swap');\n"
+)
+
+
+def delta_size(body):
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return len(msg.SerializeToString())
+
+
+def main():
+    with open(CSS_SOURCE, 'r', encoding='utf-8') as f:
+        source = f.read()
+    # The old block: the same rules inline, with the Google Fonts imports
+    # in place of the @font-face rules
+    rules = re.sub(r'@font-face\s*{[^}]*}\s*', '', source)
+    inline = f"<style>\n{GOOGLE_IMPORTS}{rules}</style>"
+    minified = stylesheet_tag()
+    
+    print(f"per-rerun websocket delta   old {delta_size(inline):7d} B   minified {delta_size(minified):7d} B")
+    print(f"render-blocking 3rd-party   old {inline.count('@import'):7d}     minified {minified.count('://'):7d}")
+    
+    fonts = [os.path.join(FONT_DIR, name) for name in sorted(os.listdir(FONT_DIR))
+             if name.endswith('.woff2')] if os.path.isdir(FONT_DIR) else []
+    print("cacheable downloads         "
+          + (', '.join(f"{os.path.basename(p)} {os.path.getsize(p)} B" for p in fonts) or 'none'))
+    missing = missing_fonts()
+    if missing:
+        raise SystemExit(f"missing fonts: {', '.join(missing)} (run python -m insights.assets)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Burst load test of the asyncio API front end.
+#
+#   python -m benchmarks.bench_async_api --clients 200 --requests 20 --pdf-share 0.1
+#
+# All clients connect at once and fire their requests back to back over
+# keep-alive connections. Reports completed req/s per one-second window
+# (it should stay flat through the burst), the status mix (200 / 304 /
+# 429 / 503), p50/p99 latency of successful requests, and how many PDF
+# renders were coalesced. Without --url an in-process server is started
+# with the given limits.
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.bench_api import percentile
+from benchmarks.bench_concurrency import make_rows
+
+
+async def client(host, port, requests, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in requests:
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n\r\n".encode('latin-1'))
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            end = time.perf_counter()
+            results.append((end, status, (end - start) * 1000))
+    finally:
+        writer.close()
+
+
+async def burst(host, port, clients, per_client, pdf_share, unique):
+    rows = make_rows(unique)
+    rng = random.Random(7)
+    
+    def path():
+        name, dob, city = rng.choice(rows)
+        endpoint = 'pdf' if rng.random() < pdf_share else 'insights'
+        return f"/v1/{endpoint}?{urlencode({'name': name, 'dob': dob, 'city': city, 'premium': 1})}"
+    
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, [path() for _ in range(per_client)], results)
+                           for _ in range(clients)))
+    return start, time.perf_counter(), results
+
+
+async def run(args):
+    server = listener = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        from insights.aio import AsyncApiServer
+        server = AsyncApiServer(workers=args.workers, max_pending=args.max_pending,
+                                rate=args.rate, burst=args.burst)
+        listener = await server.start('127.0.0.1', 0)
+        host, port = listener.sockets[0].getsockname()[:2]
+    
+    try:
+        start, end, results = await burst(host, port, args.clients, args.requests, args.pdf_share, args.unique)
+    finally:
+        if listener is not None:
+            listener.close()
+            server.close()
+    
+    elapsed = end - start
+    statuses = Counter(status for _, status, _ in results)
+    ok = [ms for _, status, ms in results if status == 200]
+    windows = Counter(int(t - start) for t, _, _ in results)
+    print(f"{len(results)} requests in {elapsed:.2f} s  ->  {len(results) / elapsed:.0f} req/s")
+    print("per-second windows: " + ' '.join(str(windows[i]) for i in range(int(elapsed) + 1)))
+    print("statuses: " + ', '.join(f"{status}={count}" for status, count in sorted(statuses.items())))
+    if ok:
+        print(f"200 latency p50 {statistics.median(ok):.2f} ms   p99 {percentile(ok, 0.99):.2f} ms")
+    if server is not None:
+        print(f"coalesced PDF renders: {server.coalesced}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='asyncio API burst load test')
+    parser.add_argument('--url', default=None)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    parser.add_argument('--pdf-share', type=float, default=0.1)
+    parser.add_argument('--unique', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--rate', type=float, default=0, help='per-client rate limit (all local clients share one IP)')
+    parser.add_argument('--burst', type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# Throughput of generate_insights_batch() vs one generate_insights() per row.
+#
+#   python -m benchmarks.bench_batch --rows 100000
+import argparse
+import time
+
+from benchmarks.bench_concurrency import make_rows, strip
+from insights.batch import generate_insights_batch
+from insights.engine import generate_insights
+from insights.templates import load_template_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch generation throughput benchmark')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    templates = load_template_index(args.templates)
+    rows = make_rows(args.rows)
+    
+    for is_premium in (False, True):
+        label = 'premium' if is_premium else 'free'
+        
+        start = time.perf_counter()
+        single = [generate_insights(*row, templates, is_premium) for row in rows]
+        single_elapsed = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        batch = list(generate_insights_batch(rows, templates, is_premium))
+        batch_elapsed = time.perf_counter() - start
+        
+        mismatches = sum(strip(a) != strip(b) for a, b in zip(single, batch))
+        print(f"{label:8} single {len(rows) / single_elapsed:10.0f} rows/s   "
+              f"batch {len(rows) / batch_elapsed:10.0f} rows/s   "
+              f"speedup x{single_elapsed / batch_elapsed:.2f}   mismatches={mismatches}")
+
+
+if __name__ == '__main__':
+    main()
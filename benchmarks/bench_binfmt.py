@@ -0,0 +1,81 @@
+# templates.json vs the memory-mapped binary format: cold load time and
+# anonymous (per-worker, unshared) memory, each measured in a fresh
+# worker process, on a corpus grown to thousands of entries per category.
+#
+#   python -m benchmarks.bench_binfmt --scale 200 --workers 4
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from insights.binfmt import write_binary
+from insights.engine import read_templates
+
+# Runs in each worker: load the index, draw readings, report as JSON
+WORKER = '''
+import json, sys, time
+from benchmarks.bench_concurrency import make_rows
+from insights.engine import generate_insights
+from insights.templates import load_template_index
+
+def anonymous_kib():
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Anonymous:'):
+                return int(line.split()[1])
+
+before = anonymous_kib()
+start = time.perf_counter()
+index = load_template_index(sys.argv[1])
+load_ms = (time.perf_counter() - start) * 1e3
+rows = make_rows(int(sys.argv[2]))
+start = time.perf_counter()
+for row in rows:
+    generate_insights(*row, index, True)
+reading_us = (time.perf_counter() - start) / len(rows) * 1e6
+print(json.dumps({'load_ms': load_ms, 'reading_us': reading_us, 'anon_kib': anonymous_kib() - before}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Binary template format benchmark')
+    parser.add_argument('--scale', type=int, default=200, help='grow every category this many times')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    raw = read_templates(args.templates)
+    for section in raw.values():
+        for category, entries in section.items():
+            section[category] = [f"{entry} ({n})" for n in range(args.scale) for entry in entries]
+    
+    workdir = tempfile.mkdtemp()
+    try:
+        json_path = os.path.join(workdir, 'templates.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False)
+        bin_path = os.path.join(workdir, 'templates.bin')
+        write_binary(json_path, bin_path)
+        entries = sum(len(v) for section in raw.values() for v in section.values())
+        print(f"{entries} entries   json {os.path.getsize(json_path) / 1024:8.1f} KiB   "
+              f"bin {os.path.getsize(bin_path) / 1024:8.1f} KiB")
+    
+        for label, path in (('json', json_path), ('bin', bin_path)):
+            procs = [subprocess.Popen([sys.executable, '-c', WORKER, path, str(args.rows)], stdout=subprocess.PIPE)
+                     for _ in range(args.workers)]
+            results = [json.loads(proc.communicate()[0]) for proc in procs]
+            load_ms = sum(r['load_ms'] for r in results) / len(results)
+            reading_us = sum(r['reading_us'] for r in results) / len(results)
+            anon_kib = sum(r['anon_kib'] for r in results)
+            print(f"{label:5} load {load_ms:8.2f} ms   {reading_us:6.2f} us/reading   "
+                  f"private memory {anon_kib / 1024:7.1f} MiB over {args.workers} workers")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Result rendering: one st.markdown per card fragment (before) vs one
+# fragment for the whole result grid (after).
+#
+#   python -m benchmarks.bench_cards --runs 200
+#
+# Both renderers run against a recording stub of `st` that counts element
+# deltas and their size. The full app is then run once per mode with
+# Streamlit's AppTest to report the script-run time and element count of
+# a real premium rerun.
+import argparse
+import statistics
+import time
+from contextlib import contextmanager
+
+from insights.cards import PREMIUM_CARDS, FREE_CARDS, LUCKY_ITEMS, LUCKY_TITLE, render_results
+from insights.engine import generate_insights
+from insights.templates import load_template_index
+
+
+class RecordingSt:
+    
+    def __init__(self):
+        self.deltas = 0
+        self.bytes = 0
+    
+    def markdown(self, body, unsafe_allow_html=False):
+        self.deltas += 1
+        self.bytes += len(body.encode('utf-8'))
+    
+    @contextmanager
+    def container(self):
+        self.deltas += 1
+        yield
+    
+    def columns(self, spec):
+        self.deltas += 1 + spec
+        return [self.container() for _ in range(spec)]
+
+
+# The pre-refactor rendering: five markdown calls per card
+def legacy_render(st, insights, is_premium):
+    def card(badge, title, key):
+        with st.container():
+            st.markdown('<div class="insight-card">', unsafe_allow_html=True)
+            st.markdown(badge, unsafe_allow_html=True)
+            st.markdown(f'<div class="card-title">{title}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="card-content">{insights.get(key, "")}</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown("---")
+    st.markdown(f'<h2 style="text-align: center; color: #4B2E2E; margin-bottom: 30px;">🌿 رسائل خاصة لـ {insights["name"]}</h2>', unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    for col, (title, key) in zip((col1, col2), FREE_CARDS):
+        with col:
+            card('<span class="free-badge">🆓 نسخة مجانية</span>', title, key)
+    
+    if is_premium:
+        st.markdown('<div class="premium-section">', unsafe_allow_html=True)
+        st.markdown('<h2 style="color: #4B2E2E; text-align: center; margin-bottom: 25px;">💎 الإضافات الكاملة</h2>', unsafe_allow_html=True)
+        badge = '<span class="premium-badge">💎 كامل</span>'
+        for row in (PREMIUM_CARDS[:4], PREMIUM_CARDS[4:]):
+            col1, col2 = st.columns(2)
+            for col, specs in ((col1, row[0::2]), (col2, row[1::2])):
+                with col:
+                    for title, key in specs:
+                        card(badge, title, key)
+        with st.container():
+            st.markdown('<div class="insight-card">', unsafe_allow_html=True)
+            st.markdown(badge, unsafe_allow_html=True)
+            st.markdown(f'<div class="card-title">{LUCKY_TITLE}</div>', unsafe_allow_html=True)
+            st.markdown('<div class="card-content">')
+            for label, key in LUCKY_ITEMS:
+                st.markdown(f'<p><strong style="color: #4B2E2E;">{label}</strong> {insights.get(key, "")}</p>')
+            st.markdown('</div>')
+            st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def single_pass_render(st, insights, is_premium):
+    st.markdown("---")
+    st.markdown(render_results(insights, is_premium), unsafe_allow_html=True)
+
+
+def bench(render, insights, is_premium, runs):
+    samples = []
+    for _ in range(runs):
+        st = RecordingSt()
+        start = time.perf_counter()
+        render(st, insights, is_premium)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return st.deltas, st.bytes, statistics.median(samples)
+
+
+def app_run(is_premium):
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_file('app.py', default_timeout=30).run()
+    at.text_input[0].input('علي بنعلي')
+    at.text_input[1].input('فاس')
+    if is_premium:
+        at.checkbox[0].check()
+    start = time.perf_counter()
+    at.button[0].click().run()
+    elapsed = time.perf_counter() - start
+    return len(list(at.main)), elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Card rendering benchmark')
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--no-app', action='store_true', help='skip the AppTest run')
+    args = parser.parse_args()
+    
+    index = load_template_index()
+    for is_premium in (False, True):
+        insights = generate_insights('علي بنعلي', '1990-01-01', 'فاس', index, is_premium)
+        label = 'premium' if is_premium else 'free'
+        for name, render in (('per-card', legacy_render), ('single-pass', single_pass_render)):
+            deltas, size, us = bench(render, insights, is_premium, args.runs)
+            print(f"{label:8} {name:12} deltas {deltas:3d}   {size:6d} B   {us:8.1f} us/render")
+        if not args.no_app:
+            elements, ms = app_run(is_premium)
+            print(f"{label:8} app rerun    elements {elements:3d}   {ms:8.1f} ms script run")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# Flat templates vs composed (multi-part, weighted) templates as the
+# corpus grows: per-reading latency and how many distinct sections a
+# crowd of users actually sees.
+#
+#   python -m benchmarks.bench_compose --rows 20000 --scales 1,10,100
+#
+# The composed corpus is synthetic: every premium category becomes an
+# opening / body / closing composition cut from its own flat templates,
+# with weights and {city}/{month} slots.
+import argparse
+import random
+import time
+
+from benchmarks.bench_concurrency import make_rows
+from insights.engine import PREMIUM_CATEGORIES, generate_insights, read_templates
+from insights.templates import compile_templates
+
+MONTHS = ['يناير', 'فبراير', 'مارس', 'أبريل', 'ماي', 'يونيو',
+          'يوليوز', 'غشت', 'شتنبر', 'أكتوبر', 'نونبر', 'دجنبر']
+
+
+def scaled(raw, scale):
+    return {section: {category: [f"{entry} ({n})" if n else entry for n in range(scale) for entry in entries]
+                      for category, entries in categories.items()}
+            for section, categories in raw.items()}
+
+
+# `raw` unscaled; the fragment lists are grown by `scale` here
+def with_fragments(raw, scale):
+    rng = random.Random(scale)
+    sections = {}
+    for category in PREMIUM_CATEGORIES:
+        words = [entry.split() for entry in raw['premium_sections'].get(category, []) if entry.split()]
+        openings = [' '.join(w[:len(w) // 3]) for w in words] + ["ف{city}،", "هاد {month}،"]
+        bodies = [' '.join(w[len(w) // 3:2 * len(w) // 3]) for w in words]
+        closings = [' '.join(w[2 * len(w) // 3:]) for w in words]
+        sections[category] = {'parts': {
+            part: [[f"{text} ({n})" if n else text, rng.randint(1, 5)] for n in range(scale) for text in texts]
+            for part, texts in (('opening', openings), ('body', bodies), ('closing', closings))
+        }}
+    composed = scaled(raw, scale)
+    composed['fragments'] = {'slots': {'month': MONTHS}, 'sections': sections}
+    return composed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Template composition benchmark')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--scales', default='1,10,100')
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    base = read_templates(args.templates)
+    rows = make_rows(args.rows)
+    for scale in (int(s) for s in args.scales.split(',')):
+        raw = scaled(base, scale)
+        composed = with_fragments(base, scale)
+        for label, templates in (('flat', raw), ('composed', composed)):
+            start = time.perf_counter()
+            index = compile_templates(templates)
+            compile_ms = (time.perf_counter() - start) * 1e3
+            # Best of three: the machine's noise is larger than the effect of scale
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                readings = [generate_insights(*row, index, True) for row in rows]
+                timings.append(time.perf_counter() - start)
+            per_reading = min(timings) / len(rows) * 1e6
+            distinct = len({r['golden_advice'] for r in readings})
+            combinations = len(index.premium_plan[len(index.free_plan)][1])
+            print(f"x{scale:<4} {label:9} compile {compile_ms:8.1f} ms   {per_reading:6.2f} us/reading   "
+                  f"golden_advice: {combinations:>12,} combinations, {distinct:6} distinct in {len(rows)} readings")
+
+
+if __name__ == '__main__':
+    main()
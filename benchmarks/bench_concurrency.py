@@ -0,0 +1,98 @@
+# Stress benchmark: N concurrent callers must get the exact same readings
+# as a single-threaded run.
+#
+#   python -m benchmarks.bench_concurrency --workers 16 --rows 2000
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from insights.engine import generate_insights, generate_seed, read_templates
+from insights.templates import load_template_index
+
+CITIES = ['الدار البيضاء', 'الرباط', 'فاس', 'مراكش', 'طنجة', 'أكادير', 'مكناس', 'وجدة']
+
+
+def make_rows(count):
+    rng = random.Random(2026)
+    rows = []
+    for i in range(count):
+        dob = f"{rng.randint(1950, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        rows.append((f"مستخدم {i}", dob, rng.choice(CITIES)))
+    return rows
+
+
+# Comparable part of a reading (generated_at is a wall-clock timestamp)
+def strip(insights):
+    return {k: v for k, v in insights.items() if k != 'generated_at'}
+
+
+# The pre-fix implementation, seeding the process-global generator
+def legacy_generate_insights(full_name, dob, city, templates, is_premium=False):
+    random.seed(generate_seed(full_name, dob, city))
+    insights = {}
+    categories = [('free_sections', 'personality'), ('free_sections', 'year_insight')]
+    if is_premium:
+        categories += [('premium_sections', c) for c in templates['premium_sections']]
+    for section_type, category in categories:
+        items = templates[section_type][category]
+        # Yield to other threads between seeding and drawing, like any
+        # real request handler doing I/O would
+        time.sleep(0)
+        insights[category] = items[random.randint(0, len(items) - 1)]
+    return insights
+
+
+_templates = None
+
+
+def _worker(row):
+    global _templates
+    if _templates is None:
+        _templates = load_template_index()
+    return strip(generate_insights(*row, _templates, is_premium=True))
+
+
+def run(fn, rows, templates, executor):
+    start = time.perf_counter()
+    results = list(executor.map(lambda row: strip(fn(*row, templates, True)), rows))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent generation stress benchmark')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    templates = load_template_index(args.templates)
+    rows = make_rows(args.rows)
+    
+    start = time.perf_counter()
+    reference = [strip(generate_insights(*row, templates, True)) for row in rows]
+    serial = time.perf_counter() - start
+    print(f"serial          {len(rows) / serial:10.0f} readings/s")
+    
+    with ThreadPoolExecutor(args.workers) as pool:
+        results, elapsed = run(generate_insights, rows, templates, pool)
+    mismatches = sum(a != b for a, b in zip(results, reference))
+    print(f"threads x{args.workers:<4}  {len(rows) / elapsed:10.0f} readings/s  mismatches={mismatches}")
+    
+    with ProcessPoolExecutor(args.workers) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(_worker, rows, chunksize=64))
+        elapsed = time.perf_counter() - start
+    mismatches = sum(a != b for a, b in zip(results, reference))
+    print(f"processes x{args.workers:<2}  {len(rows) / elapsed:10.0f} readings/s  mismatches={mismatches}")
+    
+    raw = read_templates(args.templates)
+    legacy_reference = [legacy_generate_insights(*row, raw, True) for row in rows]
+    with ThreadPoolExecutor(args.workers) as pool:
+        results, elapsed = run(legacy_generate_insights, rows, raw, pool)
+    mismatches = sum(a != b for a, b in zip(results, legacy_reference))
+    print(f"legacy global seed, threads x{args.workers}: mismatches={mismatches}")
+
+
+if __name__ == '__main__':
+    main()
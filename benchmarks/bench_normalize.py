@@ -0,0 +1,68 @@
+# Input normalization (seed scheme 3): cost per input and what it does to
+# the reading cache.
+#
+#   python -m benchmarks.bench_normalize --requests 200000 --noise 0.3 --cache-size 4096
+#
+# Replays a synthetic request stream in which a share of requests retype
+# an earlier person differently (insights.analyze.synthetic_rows) through
+# an LRU of reading keys, once per seed scheme, and reports distinct keys
+# and hit rates. Also times fold() and generate_seed() per scheme, with
+# the key LRUs cold and warm.
+import argparse
+import time
+from collections import OrderedDict
+
+from insights.analyze import synthetic_rows
+from insights.engine import generate_seed
+from insights.normalize import city_key, fold, input_key, name_key
+
+
+def hit_rate(rows, scheme, cache_size):
+    lru = OrderedDict()
+    hits = 0
+    for row in rows:
+        seed = generate_seed(*row, scheme=scheme)
+        if seed in lru:
+            lru.move_to_end(seed)
+            hits += 1
+        else:
+            lru[seed] = None
+            if len(lru) > cache_size:
+                lru.popitem(last=False)
+    return hits / len(rows)
+
+
+def per_row_us(fn, rows):
+    start = time.perf_counter()
+    for row in rows:
+        fn(*row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Input normalization benchmark')
+    parser.add_argument('--requests', type=int, default=200000)
+    parser.add_argument('--noise', type=float, default=0.3)
+    parser.add_argument('--cache-size', type=int, default=4096)
+    args = parser.parse_args()
+    
+    rows = list(synthetic_rows(args.requests, noise=args.noise))
+    print(f"{len(rows)} requests, {args.noise:.0%} retyped, LRU of {args.cache_size} readings")
+    for scheme in (2, 3):
+        keys = len({generate_seed(*row, scheme=scheme) for row in rows})
+        print(f"scheme {scheme}: {keys:8} distinct readings   "
+              f"hit rate {hit_rate(rows, scheme, args.cache_size):6.2%} (LRU)   "
+              f"{1 - keys / len(rows):6.2%} (unbounded)")
+    
+    sample = list(dict.fromkeys(rows))[:20000]
+    input_key.cache_clear()
+    name_key.cache_clear()
+    city_key.cache_clear()
+    print(f"fold(name)             {per_row_us(lambda name, dob, city: fold(name), sample):7.2f} us")
+    print(f"scheme 2 seed          {per_row_us(lambda *row: generate_seed(*row, scheme=2), sample):7.2f} us")
+    print(f"scheme 3 seed, cold    {per_row_us(lambda *row: generate_seed(*row, scheme=3), sample[:4096]):7.2f} us")
+    print(f"scheme 3 seed, warm    {per_row_us(lambda *row: generate_seed(*row, scheme=3), sample[:4096]):7.2f} us")
+
+
+if __name__ == '__main__':
+    main()
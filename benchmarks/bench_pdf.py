@@ -0,0 +1,80 @@
+# PDF export: per-click FPDF + full TTF parse (the old create_pdf) vs the
+# subset font + compiled layout, and memoized re-exports.
+#
+#   python -m benchmarks.bench_pdf --font /path/to/arabic.ttf
+import argparse
+import logging
+import statistics
+import time
+import warnings
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from insights import pdf
+from insights.engine import generate_insights
+from insights.templates import load_template_index
+
+
+# Old approach: new FPDF and full font parse on every export
+def naive_pdf(insights, is_premium, font_path):
+    doc = FPDF()
+    doc.add_page()
+    doc.add_font('Naive', '', font_path)
+    doc.set_font('Naive', size=12)
+    for kind, size, label, key, align, gap in pdf.HEADER + (pdf.PREMIUM if is_premium else ()) + pdf.FOOTER:
+        if kind == 'gap':
+            doc.ln(gap)
+            continue
+        doc.set_font('Naive', size=size)
+        text = label + (str(insights.get(key, '')) if key else '')
+        if kind == 'cell':
+            doc.cell(200, 10, text, align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        else:
+            doc.multi_cell(0, 10, text, align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        if gap:
+            doc.ln(gap)
+    return bytes(doc.output())
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF export benchmark')
+    parser.add_argument('--font', default=pdf.FONT_PATH)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    logging.getLogger('fpdf').setLevel(logging.ERROR)
+    
+    index = load_template_index()
+    readings = [generate_insights(f"مستخدم {i}", '1990-01-01', 'فاس', index, True) for i in range(args.runs)]
+    
+    start = time.perf_counter()
+    pdf.load_font(args.font)
+    print(f"font subset (once per process)   {(time.perf_counter() - start) * 1000:8.1f} ms")
+    
+    it = iter(readings * 2)
+    print(f"naive FPDF + full font parse     {timed(lambda: naive_pdf(next(it), True, args.font), args.runs):8.1f} ms p50")
+    it = iter(readings * 2)
+    print(f"subset font + compiled layout    {timed(lambda: pdf.render_pdf(next(it), True, args.font), args.runs):8.1f} ms p50")
+    
+    memo = pdf.PdfMemo()
+    render = pdf.render_pdf
+    pdf.render_pdf = lambda insights, is_premium: render(insights, is_premium, args.font)
+    try:
+        pdf.create_pdf(readings[0], True, memo)
+        print(f"memoized re-export               {timed(lambda: pdf.create_pdf(readings[0], True, memo), args.runs):8.3f} ms p50")
+    finally:
+        pdf.render_pdf = render
+
+
+if __name__ == '__main__':
+    main()
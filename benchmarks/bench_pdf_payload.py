@@ -0,0 +1,69 @@
+# Websocket payload and per-session memory of the PDF export: base64 data
+# URI inside st.markdown (before) vs st.download_button (after).
+#
+#   python -m benchmarks.bench_pdf_payload --font /path/to/arabic.ttf
+#
+# "before" serializes the markdown delta exactly as the old code built it.
+# "after" serializes the download_button delta, which carries only a media
+# URL; the bytes are fetched over plain HTTP from Streamlit's media
+# endpoint. Memory is what each approach keeps alive per session: the
+# base64 HTML string held in the delta/message cache vs the raw bytes held
+# by the media file manager.
+import argparse
+import base64
+import hashlib
+import logging
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from insights.engine import generate_insights
+from insights.pdf import FONT_PATH, pdf_filename, render_pdf
+from insights.templates import load_template_index
+
+
+def markdown_delta(pdf_data, insights):
+    b64 = base64.b64encode(pdf_data).decode()
+    href = f'<a href="data:application/pdf;base64,{b64}" download="{pdf_filename(insights)}" style="text-decoration: none; color: white;">⬇️ تحميل PDF</a>'
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = f"""
+                    <div style="text-align: center; padding: 10px;">
+                        {href}
+                    </div>
+                    """
+    msg.delta.new_element.markdown.allow_html = True
+    return msg.SerializeToString(), len(href.encode('utf-8'))
+
+
+def download_button_delta(pdf_data):
+    msg = ForwardMsg()
+    button = msg.delta.new_element.download_button
+    button.id = hashlib.md5(pdf_data).hexdigest()
+    button.label = "⬇️ تحميل PDF"
+    button.url = f"/media/{hashlib.sha224(pdf_data).hexdigest()}.pdf"
+    button.use_container_width = True
+    return msg.SerializeToString()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF export payload benchmark')
+    parser.add_argument('--font', default=FONT_PATH)
+    args = parser.parse_args()
+    logging.getLogger('fpdf').setLevel(logging.ERROR)
+    
+    index = load_template_index()
+    for is_premium in (False, True):
+        insights = generate_insights('علي بنعلي', '1990-01-01', 'الدار البيضاء', index, is_premium)
+        pdf_data = render_pdf(insights, is_premium, args.font)
+        
+        before, retained_before = markdown_delta(pdf_data, insights)
+        after = download_button_delta(pdf_data)
+        label = 'premium' if is_premium else 'free'
+        print(f"{label:8} pdf {len(pdf_data):8d} B")
+        print(f"         websocket delta   before {len(before):8d} B   after {len(after):6d} B"
+              f"   (x{len(before) / len(after):.0f} smaller)")
+        print(f"         session memory    before {retained_before:8d} B   after {len(pdf_data):6d} B"
+              f"   (-{1 - len(pdf_data) / retained_before:.0%})")
+
+
+if __name__ == '__main__':
+    main()
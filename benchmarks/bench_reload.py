@@ -0,0 +1,58 @@
+# Template hot reload: full recompilation vs incremental recompilation
+# after a one-category edit, and the per-run cost of TemplateStore.current().
+#
+#   python -m benchmarks.bench_reload --runs 200
+import argparse
+import copy
+import os
+import shutil
+import tempfile
+import time
+
+from insights.engine import read_templates
+from insights.store import TemplateStore
+from insights.templates import changed_categories, compile_templates
+
+
+def per_call_us(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Template hot reload benchmark')
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--scale', type=int, default=20, help='repeat every category this many times')
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    raw = read_templates(args.templates)
+    # Grow the corpus so recompilation cost is measurable
+    for section in raw.values():
+        for category, entries in section.items():
+            section[category] = [f"{entry} ({n})" for n in range(args.scale) for entry in entries]
+    previous = compile_templates(raw)
+    edited = copy.deepcopy(raw)
+    edited['premium_sections']['moroccan_joke'].append("نكتة جديدة")
+    
+    full = per_call_us(lambda: compile_templates(edited), args.runs)
+    incremental = per_call_us(lambda: compile_templates(edited, previous), args.runs)
+    changed = changed_categories(previous, compile_templates(edited, previous))
+    print(f"recompile   full {full:9.1f} us   incremental {incremental:9.1f} us   changed={len(changed)}")
+    
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'templates.json')
+        shutil.copy(args.templates, path)
+        for interval in (1.0, 0.0):
+            store = TemplateStore(path, check_interval=interval)
+            cost = per_call_us(store.current, args.runs * 100)
+            print(f"current()   check_interval={interval:3.1f}s   {cost:7.2f} us/call")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
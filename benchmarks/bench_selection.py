@@ -0,0 +1,88 @@
+# Speed and template coverage of the 'legacy' and 'permutation' pickers.
+#
+#   python -m benchmarks.bench_selection --rows 200000
+#
+# Two measurements per mode:
+#   readings  - one draw per category per reading (what the app does today),
+#               reporting latency and how evenly templates are spread
+#   repeated  - `size` draws from the same category per seed, reporting the
+#               share of repeats and of fallbacks to the last template
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.bench_concurrency import make_rows
+from insights.engine import SELECTION_MODES, generate_insights, generate_seed, make_picker
+from insights.templates import load_template_index
+
+
+# Spread of counts over a category: coverage, min/max ratio, chi-square.
+# Categories may list the same text several times (lucky_day does), so the
+# expected count of each distinct text is weighted by its multiplicity.
+def spread(counter, items):
+    multiplicity = Counter(items)
+    total = sum(counter.values())
+    chi2 = 0.0
+    ratios = []
+    for item, weight in multiplicity.items():
+        expected = total * weight / len(items)
+        observed = counter.get(item, 0)
+        chi2 += (observed - expected) ** 2 / expected if expected else 0.0
+        ratios.append(observed / weight)
+    covered = sum(1 for item in multiplicity if counter.get(item))
+    ratio = min(ratios) / max(ratios) if max(ratios) else 0.0
+    return covered / len(multiplicity), ratio, chi2, len(multiplicity) - 1
+
+
+def bench_readings(index, rows, selection):
+    counters = {category: Counter() for category, _ in index.plan(True)}
+    start = time.perf_counter()
+    readings = [generate_insights(*row, index, True, selection) for row in rows]
+    elapsed = time.perf_counter() - start
+    for insights in readings:
+        for category, counter in counters.items():
+            counter[insights[category]] += 1
+    return elapsed, counters
+
+
+def bench_repeated(items, seeds, selection):
+    size = len(items)
+    repeats = last = 0
+    start = time.perf_counter()
+    for seed in seeds:
+        pick = make_picker(seed, selection)
+        drawn = [pick('category', items) for _ in range(size)]
+        repeats += size - len(set(drawn))
+        last += drawn.count(items[-1]) - 1
+    elapsed = time.perf_counter() - start
+    draws = size * len(seeds)
+    return elapsed / draws * 1e6, repeats / draws, max(last, 0) / draws
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Selection mode benchmark')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    index = load_template_index(args.templates)
+    rows = make_rows(args.rows)
+    
+    for selection in SELECTION_MODES:
+        elapsed, counters = bench_readings(index, rows, selection)
+        print(f"[{selection}] {elapsed / len(rows) * 1e6:.2f} us/premium reading")
+        print(f"  {'category':24} {'coverage':>8} {'min/max':>8} {'chi2':>8}  df")
+        for category, items in index.plan(True):
+            coverage, ratio, chi2, df = spread(counters[category], items)
+            print(f"  {category:24} {coverage:8.0%} {ratio:8.3f} {chi2:8.1f}  {df}")
+        
+        items = index.plan(False)[0][1]
+        seeds = [generate_seed(*row) for row in rows[:2000]]
+        per_draw, repeat_share, last_share = bench_repeated(items, seeds, selection)
+        print(f"  repeated draws ({len(items)} per seed): {per_draw:.2f} us/draw, "
+              f"repeats {repeat_share:.1%}, extra last-template picks {last_share:.1%}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Arabic shaping cost: arabic_reshaper as shipped vs the cached-regex
+# reshaper, and first use vs LRU hits of template and user strings.
+#
+#   python -m benchmarks.bench_shaping --runs 3
+import argparse
+import time
+
+from insights.shaping import Shaper, reorder, reshape
+from insights.templates import load_template_index
+
+
+def per_text_us(fn, texts, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Arabic shaping benchmark')
+    parser.add_argument('--templates', default='templates.json')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    
+    import arabic_reshaper
+    index = load_template_index(args.templates)
+    texts = list(dict.fromkeys(text for entries in index.items for text in entries))
+    
+    print(f"{len(texts)} template strings")
+    print(f"arabic_reshaper.reshape (as shipped): {per_text_us(arabic_reshaper.reshape, texts, 1):9.1f} us/text")
+    print(f"reshape (ligature regex kept):        {per_text_us(reshape, texts, args.runs):9.1f} us/text")
+    print(f"reorder (bidi):                       {per_text_us(reorder, texts, args.runs):9.1f} us/text")
+    
+    shaper = Shaper(maxsize=2 * len(texts))
+    print(f"template string, first time:          {per_text_us(shaper, texts, 1):9.1f} us/text")
+    print(f"template string, LRU hit:             {per_text_us(shaper, texts, args.runs):9.3f} us/text")
+    
+    names = [f"{text.split()[0]} {n}" for n, text in enumerate(texts)]
+    print(f"user string, first time:              {per_text_us(shaper, names, 1):9.1f} us/text")
+    print(f"user string, LRU hit:                 {per_text_us(shaper, names, args.runs):9.3f} us/text")
+
+
+if __name__ == '__main__':
+    main()
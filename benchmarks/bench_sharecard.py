@@ -0,0 +1,74 @@
+# Share card throughput: images/sec on one core and across a process pool.
+#
+#   python -m benchmarks.bench_sharecard --font /path/to/arabic.ttf --cards 200 --workers 4
+#
+# Every card is a distinct reading rendered from scratch (render_card, no
+# memo); the background layer, font atlases and shaping table are built
+# before timing, once per process. Also reports the first card of a fresh
+# process (building all of that) and memo hits.
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.bench_concurrency import make_rows
+
+
+def _setup(font, fmt):
+    if font:
+        os.environ['INSIGHTS_PDF_FONT'] = font
+    global _readings, _render
+    from insights.engine import generate_insights
+    from insights.sharecard import background, render_card
+    from insights.templates import load_template_index
+    index = load_template_index()
+    background()
+    _render = lambda reading: render_card(reading, True, fmt)
+    _readings = [generate_insights(*row, index, True) for row in make_rows(256)]
+    _render(_readings[0])
+
+
+def _render_range(job):
+    start, stop = job
+    return sum(len(_render(_readings[i % len(_readings)])) for i in range(start, stop))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Share card benchmark')
+    parser.add_argument('--font', help='TTF with Arabic glyphs (default: INSIGHTS_PDF_FONT or the vendored font)')
+    parser.add_argument('--cards', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--format', choices=('png', 'webp'), default='png')
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    _setup(args.font, args.format)
+    print(f"first card (atlas, background, shaping table): {(time.perf_counter() - start) * 1e3:8.1f} ms")
+    
+    start = time.perf_counter()
+    total = _render_range((0, args.cards))
+    elapsed = time.perf_counter() - start
+    print(f"1 core     {args.cards / elapsed:8.1f} cards/s   {elapsed / args.cards * 1e3:6.1f} ms/card   "
+          f"{total / args.cards / 1024:6.1f} KiB/card ({args.format})")
+    
+    chunk = max(1, args.cards // (args.workers * 4))
+    jobs = [(i, min(i + chunk, args.cards)) for i in range(0, args.cards, chunk)]
+    with ProcessPoolExecutor(args.workers, initializer=_setup, initargs=(args.font, args.format)) as pool:
+        list(pool.map(_render_range, [(0, 1)] * args.workers))
+        start = time.perf_counter()
+        list(pool.map(_render_range, jobs))
+        elapsed = time.perf_counter() - start
+    print(f"{args.workers} workers  {args.cards / elapsed:8.1f} cards/s")
+    
+    from insights.pdf import PdfMemo
+    from insights.sharecard import create_card
+    memo = PdfMemo()
+    create_card(_readings[0], True, args.format, memo)
+    start = time.perf_counter()
+    for _ in range(1000):
+        create_card(_readings[0], True, args.format, memo)
+    print(f"memo hit   {(time.perf_counter() - start) / 1000 * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
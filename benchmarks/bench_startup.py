@@ -0,0 +1,79 @@
+# Cold start and per-rerun cost of the Streamlit entry script.
+#
+#   python -m benchmarks.bench_startup --runs 5 [--script app.py]
+#
+# import: a fresh interpreter imports streamlit, then the modules the entry
+# script imports (timed separately, best of --runs); reports whether fpdf
+# got pulled in. script: the entry script's top level executed the way a
+# rerun does (compiled once, exec'd with main() not called), best of --runs
+# batches. Point --script at an older app.py to compare.
+import argparse
+import ast
+import json
+import logging
+import subprocess
+import sys
+import time
+
+IMPORT_PROBE = """
+import json, sys, time
+import streamlit
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{'ms': (time.perf_counter() - start) * 1e3, 'fpdf': 'fpdf' in sys.modules}}))
+"""
+
+
+# Modules the script imports at top level (excluding streamlit itself)
+def script_imports(source):
+    names = []
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return [name for name in names if not name.startswith('streamlit')]
+
+
+def import_time(modules, runs):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', IMPORT_PROBE.format(modules=modules)],
+                             capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return min(r['ms'] for r in results), results[0]['fpdf']
+
+
+def script_time(source, path, runs, batch=200):
+    code = compile(source, path, 'exec')
+    # set_page_config() outside a Streamlit runtime only logs a warning
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    exec(code, {'__name__': '__bench__'})
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(batch):
+            exec(code, {'__name__': '__bench__'})
+        best = min(best, (time.perf_counter() - start) / batch)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Entry script start-up benchmark')
+    parser.add_argument('--script', default='app.py')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    
+    with open(args.script, encoding='utf-8') as f:
+        source = f.read()
+    modules = script_imports(source)
+    
+    ms, fpdf_loaded = import_time(modules, args.runs)
+    print(f"import {len(modules)} modules: {ms:8.1f} ms   fpdf imported: {'yes' if fpdf_loaded else 'no'}")
+    print(f"script top level per rerun:   {script_time(source, args.script, args.runs):8.1f} us "
+          f"({len(source.splitlines())} lines)")
+
+
+if __name__ == '__main__':
+    main()
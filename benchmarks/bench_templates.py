@@ -0,0 +1,49 @@
+# Raw templates.json dicts vs the compiled TemplateIndex: per-reading
+# latency and retained memory.
+#
+#   python -m benchmarks.bench_templates --rows 50000
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.bench_concurrency import make_rows, strip
+from insights.engine import generate_insights, read_templates
+from insights.templates import compile_templates
+
+
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Template index benchmark')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args()
+    
+    raw, raw_bytes = retained_bytes(lambda: read_templates(args.templates))
+    index, index_bytes = retained_bytes(lambda: compile_templates(read_templates(args.templates)))
+    print(f"retained memory   raw dicts {raw_bytes / 1024:8.1f} KiB   index {index_bytes / 1024:8.1f} KiB")
+    
+    rows = make_rows(args.rows)
+    for is_premium in (False, True):
+        timings = {}
+        outputs = {}
+        for label, templates in (('raw', raw), ('index', index)):
+            start = time.perf_counter()
+            outputs[label] = [strip(generate_insights(*row, templates, is_premium)) for row in rows]
+            timings[label] = (time.perf_counter() - start) / len(rows) * 1e6
+        mismatches = sum(a != b for a, b in zip(outputs['raw'], outputs['index']))
+        print(f"{'premium' if is_premium else 'free':8} raw {timings['raw']:6.2f} us/reading   "
+              f"index {timings['index']:6.2f} us/reading   mismatches={mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+# Benchmark suite: generation, rendering, PDF export and full script runs.
+#
+#   python -m benchmarks.run                          # run every case
+#   python -m benchmarks.run --only generate          # cases matching a substring
+#   python -m benchmarks.run --save benchmarks/baselines/main.json
+#   python -m benchmarks.run --compare benchmarks/baselines/main.json
+#
+# Every case runs in a fresh (spawned) interpreter so peak RSS is its own
+# and no cache leaks in from an earlier case. A case does `warmup`
+# untimed operations, then times `iterations` operations one by one and
+# reports ops/s, p50 / p99 latency and the process's peak RSS.
+#
+# --save writes the results plus git commit and interpreter details as a
+# JSON baseline; --compare runs the suite again and flags every case
+# whose p50 or p99 grew by more than --threshold (exit status 1).
+#
+# PDF and card cases need an Arabic TTF (INSIGHTS_PDF_FONT) and app cases need
+# streamlit; without them those cases are reported as skipped.
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.bench_api import percentile
+from benchmarks.bench_concurrency import make_rows
+
+ROWS = make_rows(4096)
+
+
+class Skip(Exception):
+    pass
+
+
+# Each case function prepares its state and returns (op, iterations,
+# warmup); op() performs one operation and may use the iteration number.
+
+def case_seed(scheme):
+    from insights.engine import generate_seed
+    
+    def op(i):
+        generate_seed(*ROWS[i % len(ROWS)], scheme=scheme)
+    return op, 20000, 1000
+
+
+def case_generate(is_premium):
+    from insights.engine import generate_insights
+    from insights.templates import load_template_index
+    index = load_template_index()
+    
+    def op(i):
+        generate_insights(*ROWS[i % len(ROWS)], index, is_premium)
+    return op, 10000, 500
+
+
+# One op = one row of a 256-row batch
+def case_batch(is_premium):
+    from insights.batch import generate_insights_batch
+    from insights.templates import load_template_index
+    index = load_template_index()
+    rows = ROWS[:256]
+    
+    def op(i):
+        for _ in generate_insights_batch(rows, index, is_premium):
+            pass
+    return op, 100, 10, len(rows)
+
+
+# cold: every op is a new input (cache miss); warm: always the same input
+def case_cached(is_premium, warm):
+    from insights.cache import ReadingCache, cached_insights
+    from insights.templates import load_template_index
+    index = load_template_index()
+    cache = ReadingCache(maxsize=len(ROWS) * 4)
+    
+    def op(i):
+        cached_insights(*(ROWS[0] if warm else ROWS[i % len(ROWS)]), index, is_premium, cache)
+    return op, 4000 if not warm else 20000, 0 if not warm else 100
+
+
+def case_cards(is_premium):
+    from insights.cards import render_results
+    from insights.engine import generate_insights
+    from insights.templates import load_template_index
+    index = load_template_index()
+    readings = [generate_insights(*row, index, is_premium) for row in ROWS[:256]]
+    
+    def op(i):
+        render_results(readings[i % len(readings)], is_premium)
+    return op, 10000, 500
+
+
+# cold: layout and font cached, PDF rendered every time; warm: memo hit
+def case_pdf(is_premium, warm):
+    from insights.engine import generate_insights
+    from insights.pdf import FONT_PATH, PdfMemo, create_pdf, render_pdf
+    from insights.templates import load_template_index
+    if not os.path.exists(FONT_PATH):
+        raise Skip(f"no font at {FONT_PATH} (set INSIGHTS_PDF_FONT)")
+    import logging
+    logging.getLogger('fpdf').setLevel(logging.ERROR)
+    index = load_template_index()
+    readings = [generate_insights(*row, index, is_premium) for row in ROWS[:64]]
+    memo = PdfMemo()
+    
+    def op(i):
+        if warm:
+            create_pdf(readings[0], is_premium, memo)
+        else:
+            render_pdf(readings[i % len(readings)], is_premium)
+    return op, 100 if not warm else 5000, 3
+
+
+# cold: background and atlases built, card rendered every time; warm: memo hit
+def case_card(fmt, warm):
+    from insights.engine import generate_insights
+    from insights.pdf import FONT_PATH, PdfMemo
+    from insights.sharecard import create_card, render_card
+    from insights.templates import load_template_index
+    if not os.path.exists(FONT_PATH):
+        raise Skip(f"no font at {FONT_PATH} (set INSIGHTS_PDF_FONT)")
+    index = load_template_index()
+    readings = [generate_insights(*row, index, True) for row in ROWS[:64]]
+    memo = PdfMemo()
+    
+    def op(i):
+        if warm:
+            create_card(readings[0], True, fmt, memo)
+        else:
+            render_card(readings[i % len(readings)], True, fmt)
+    return op, 100 if not warm else 5000, 3
+
+
+# Full app.py script runs through Streamlit's AppTest.
+# first: a new session's first page load; generate: clicking the button
+# (warm reading cache); rerun: a rerun that only redraws the reading
+def case_app(kind, is_premium):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        raise Skip("streamlit is not installed")
+    
+    def session():
+        at = AppTest.from_file('app.py', default_timeout=60).run()
+        at.text_input[0].input('علي بنعلي')
+        at.text_input[1].input('فاس')
+        if is_premium:
+            at.checkbox[0].check()
+        return at
+    
+    if kind == 'first':
+        def op(i):
+            AppTest.from_file('app.py', default_timeout=60).run()
+        return op, 20, 2
+    
+    at = session()
+    at.button[0].click().run()
+    if kind == 'generate':
+        def op(i):
+            at.button[0].click().run()
+    else:
+        def op(i):
+            at.run()
+    return op, 30, 3
+
+
+CASES = {
+    'seed/scheme1': (case_seed, 1),
+    'seed/scheme2': (case_seed, 2),
+    'seed/scheme3': (case_seed, 3),
+    'generate/free': (case_generate, False),
+    'generate/premium': (case_generate, True),
+    'batch/free': (case_batch, False),
+    'batch/premium': (case_batch, True),
+    'cache/premium/cold': (case_cached, True, False),
+    'cache/premium/warm': (case_cached, True, True),
+    'cards/free': (case_cards, False),
+    'cards/premium': (case_cards, True),
+    'pdf/free/cold': (case_pdf, False, False),
+    'pdf/premium/cold': (case_pdf, True, False),
+    'pdf/premium/warm': (case_pdf, True, True),
+    'card/png/cold': (case_card, 'png', False),
+    'card/webp/cold': (case_card, 'webp', False),
+    'card/png/warm': (case_card, 'png', True),
+    'app/first-run': (case_app, 'first', False),
+    'app/generate/free': (case_app, 'generate', False),
+    'app/generate/premium': (case_app, 'generate', True),
+    'app/rerun/premium': (case_app, 'rerun', True),
+}
+
+
+# Runs in the spawned child
+def run_case(name):
+    fn, *args = CASES[name]
+    try:
+        op, iterations, warmup, *per_op = fn(*args)
+    except Skip as e:
+        return {'skipped': str(e)}
+    per_op = per_op[0] if per_op else 1
+    
+    for i in range(warmup):
+        op(i)
+    samples = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for i in range(iterations):
+        t = clock()
+        op(i)
+        samples.append(clock() - t)
+    total = clock() - start
+    
+    # Latencies are per unit of work (per row for batch cases)
+    return {
+        'iterations': iterations * per_op,
+        'ops_per_sec': round(iterations * per_op / total * 1e9, 1),
+        'p50_us': round(percentile(samples, 0.50) / per_op / 1e3, 2),
+        'p99_us': round(percentile(samples, 0.99) / per_op / 1e3, 2),
+        'peak_rss_mib': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_suite(names):
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+            results[name] = result = pool.submit(run_case, name).result()
+        print_result(name, result)
+    return results
+
+
+def print_result(name, result):
+    if 'skipped' in result:
+        print(f"{name:24} skipped: {result['skipped']}")
+        return
+    print(f"{name:24} {result['ops_per_sec']:12,.1f} ops/s   p50 {result['p50_us']:10.2f} us   "
+          f"p99 {result['p99_us']:10.2f} us   peak RSS {result['peak_rss_mib']:6.1f} MiB")
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+# Cases whose p50 or p99 regressed by more than `threshold` (a fraction)
+def regressions(results, baseline, threshold):
+    found = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or 'skipped' in result or 'skipped' in before:
+            continue
+        for metric in ('p50_us', 'p99_us'):
+            if result[metric] > before[metric] * (1 + threshold):
+                found.append((name, metric, before[metric], result[metric]))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--only', action='append', default=[], help='run cases containing this substring')
+    parser.add_argument('--list', action='store_true', help='list case names and exit')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown (default 0.10)')
+    args = parser.parse_args(argv)
+    
+    names = [name for name in CASES if not args.only or any(part in name for part in args.only)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+    
+    results = run_suite(names)
+    
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"saved {args.save}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline['results'], args.threshold)
+        print(f"compared with {args.compare} (commit {baseline['environment'].get('commit')})")
+        for name, metric, before, after in found:
+            print(f"  REGRESSION {name} {metric}: {before:.2f} -> {after:.2f} us ({after / before - 1:+.0%})")
+        if found:
+            return 1
+        print(f"  no case slower than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
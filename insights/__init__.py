@@ -0,0 +1,16 @@
+# Core engine for the Moroccan personal insights app.
+# Nothing in this package imports streamlit, so it can be used from
+# worker threads, process pools, scripts and benchmarks.
+from insights.engine import (
+    generate_seed,
+    generate_insights,
+    category_plan,
+    draw_sections,
+    make_picker,
+    read_templates,
+    FREE_CATEGORIES,
+    PREMIUM_CATEGORIES,
+    SELECTION_MODES,
+    SEED_SCHEMES,
+)
+from insights.batch import generate_insights_batch
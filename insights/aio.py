@@ -0,0 +1,241 @@
+# asyncio front end for the HTTP API.
+#
+#   python -m insights.aio --port 8601 --workers 4 --max-pending 64 --rate 20 --burst 40
+#
+# Same routes and responses as insights.api (both call ApiApp.handle()),
+# with explicit concurrency control:
+#   - cheap routes (single readings, permalinks, health) run on the
+#     loop's default thread pool, so a SQLite cache or permalink store
+#     waiting on its lock, or a template reload, never stalls the loop
+#   - PDF renders, share cards and batches are offloaded to an executor
+#   - each client IP gets a token bucket; over the limit answers 429
+#   - at most `max_pending` offloaded requests wait at once; beyond that
+#     the server answers 503 with Retry-After instead of queueing forever
+#   - identical offloaded requests (same route, input as typed, premium
+#     flag and format) in flight at the same time share one execution
+#   - malformed framing (bad Content-Length) answers 400 and closes the
+#     connection; an exception from a handler answers 500
+import argparse
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from insights.api import ApiApp, BadRequest, _json
+
+HEAVY_ROUTES = ('/v1/pdf', '/v1/card', '/v1/insights/batch')
+KEEP_ALIVE_TIMEOUT = 15
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+    
+    # Take one token for `client`; returns seconds to wait when empty
+    def take(self, client, now=None):
+        now = time.monotonic() if now is None else now
+        tokens, last = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[client] = (tokens - 1, now)
+        if len(self._buckets) > 10000:
+            self._forget_idle(now)
+        return 0.0
+    
+    def _forget_idle(self, now):
+        full_after = self.burst / self.rate
+        for client, (_, last) in list(self._buckets.items()):
+            if now - last > full_after:
+                del self._buckets[client]
+
+
+# Per-process app for ProcessPoolExecutor workers
+_process_app = None
+
+
+def _handle_in_process(method, target, headers, body):
+    global _process_app
+    if _process_app is None:
+        _process_app = ApiApp()
+    return _process_app.handle(method, target, headers, body)
+
+
+class AsyncApiServer:
+    
+    def __init__(self, app=None, workers=4, max_pending=64, rate=20.0, burst=40, use_processes=False):
+        self.app = app or ApiApp()
+        self.use_processes = use_processes
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = max_pending
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.pending = 0
+        self.coalesced = 0
+        self._inflight = {}
+    
+    # Key under which identical offloaded requests are coalesced. PDFs and
+    # cards print the input as typed, so inputs that merely share a seed
+    # (a boundary shift, or spelling variants under seed scheme 3) must
+    # not share a document
+    def _coalesce_key(self, method, url, headers, body):
+        if 'if-none-match' in headers:
+            return None
+        try:
+            if url.path in ('/v1/pdf', '/v1/card'):
+                params = self.app._params(method, url.query, body)
+                full_name, dob, city, is_premium = self.app._reading_args(params)
+                fmt = params.get('format')
+                if fmt is not None and not isinstance(fmt, str):
+                    return None
+                return (url.path, full_name, dob, city, is_premium, fmt)
+        except BadRequest:
+            return None
+        return (url.path, method, url.query, body, headers.get('accept-encoding', ''))
+    
+    def _run(self, method, target, headers, body):
+        loop = asyncio.get_running_loop()
+        if self.use_processes:
+            return loop.run_in_executor(self.executor, _handle_in_process, method, target, headers, body)
+        return loop.run_in_executor(self.executor, self.app.handle, method, target, headers, body)
+    
+    async def dispatch(self, method, target, headers, body, client):
+        if self.limiter is not None:
+            wait = self.limiter.take(client)
+            if wait:
+                return _json(429, {'error': "rate limit exceeded"}, {'Retry-After': str(max(1, round(wait)))})
+        
+        url = urlsplit(target)
+        if url.path not in HEAVY_ROUTES:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.app.handle, method, target, headers, body)
+        
+        key = self._coalesce_key(method, url, headers, body)
+        shared = self._inflight.get(key) if key is not None else None
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared)
+        
+        if self.pending >= self.max_pending:
+            return _json(503, {'error': "server busy"}, {'Retry-After': '1'})
+        
+        self.pending += 1
+        future = asyncio.ensure_future(self._run(method, target, headers, body))
+        if key is not None:
+            self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self.pending -= 1
+            if key is not None and self._inflight.get(key) is future:
+                del self._inflight[key]
+    
+    async def handle_client(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if peer else 'unknown'
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, _json(400, {'error': "bad request line"}), False)
+                    break
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                # Digits only: int() would also take a sign, spaces or underscores
+                length = headers.get('content-length') or '0'
+                if not (length.isascii() and length.isdigit()):
+                    await self._write(writer, _json(400, {'error': "bad content-length"}), False)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, _json(413, {'error': "body too large"}), False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                try:
+                    response = await self.dispatch(method.upper(), target, headers, body, client)
+                except Exception:
+                    # Also reached by coalesced requests when the shared execution fails
+                    logger.exception("%s %s failed", method, target)
+                    response = _json(500, {'error': "internal error"})
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _write(self, writer, response, keep_alive):
+        status, headers, body = response
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        head.append(f"Content-Length: {len(body)}")
+        head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+    
+    async def start(self, host='127.0.0.1', port=8601):
+        return await asyncio.start_server(self.handle_client, host, port, backlog=1024)
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the HTTP API on asyncio')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8601)
+    parser.add_argument('--workers', type=int, default=4, help='executor size for PDF/batch requests')
+    parser.add_argument('--processes', action='store_true', help='use a process pool instead of threads')
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--rate', type=float, default=20.0, help='requests/sec per client IP (0 disables)')
+    parser.add_argument('--burst', type=int, default=40)
+    args = parser.parse_args(argv)
+    
+    server = AsyncApiServer(workers=args.workers, max_pending=args.max_pending, rate=args.rate,
+                            burst=args.burst, use_processes=args.processes)
+    
+    async def serve():
+        listener = await server.start(args.host, args.port)
+        print(f"serving on http://{args.host}:{args.port}")
+        async with listener:
+            await listener.serve_forever()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
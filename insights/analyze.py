@@ -0,0 +1,274 @@
+# Seed and template distribution analyzer.
+#
+#   python -m insights.analyze --rows 200000 --workers 4 --premium
+#   python -m insights.analyze --input users.csv --scheme 2
+#   python -m insights.analyze --rows 200000 --noise 0.3 --scheme 3
+#
+# Runs a synthetic (or real name/dob/city) corpus through seed derivation
+# and selection in a process pool, then reports:
+#   - how many distinct inputs remain once insights.normalize has reduced
+#     them to their seeding keys (what scheme 3 collapses), overall and
+#     per name / city
+#   - seed collisions between distinct inputs (distinct keys under scheme
+#     3), and how many inputs share a seed with the same input shifted
+#     across a field boundary
+#   - per-category template histograms with a chi-square uniformity test
+#     (p-value from the Wilson-Hilferty approximation, no scipy needed)
+#   - the share of readings identical to an earlier one, next to the share
+#     expected if every category were drawn uniformly and independently
+import argparse
+import hashlib
+import json
+import math
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from insights.batch import read_rows
+from insights.compose import Composition
+from insights.engine import (
+    DEFAULT_SEED_SCHEME,
+    SEED_SCHEMES,
+    SELECTION_MODES,
+    category_plan,
+    draw_sections,
+    generate_seed,
+    make_picker,
+)
+from insights.normalize import city_key, input_key, name_key
+from insights.templates import load_template_index
+
+FIRST_NAMES = ['محمد', 'فاطمة', 'يوسف', 'خديجة', 'أمين', 'سلمى', 'عمر', 'مريم', 'حمزة', 'هدى',
+               'Ali', 'Sara', 'Youssef', 'Imane', 'Karim', 'Nadia', 'Mehdi', 'Salma', 'Anas', 'Hiba']
+LAST_NAMES = ['العلوي', 'بناني', 'الإدريسي', 'التازي', 'الفاسي', 'برادة', 'الشرقاوي', 'المنصوري',
+              'Alaoui', 'Bennani', 'Idrissi', 'Tazi', 'Fassi', 'Berrada', 'Cherkaoui', 'Mansouri']
+CITIES = ['الدار البيضاء', 'الرباط', 'فاس', 'مراكش', 'طنجة', 'أكادير', 'مكناس', 'وجدة',
+          'Casablanca', 'Rabat', 'Fes', 'Marrakech', 'Tanger', 'Agadir', 'Meknes', 'Oujda']
+
+TASHKEEL = 'ًٌٍَُِّْ'
+# Ways the same text gets typed differently
+VARIANTS = (
+    lambda text, rng: text + ' ',
+    lambda text, rng: ' ' + text.replace(' ', '  '),
+    lambda text, rng: text.replace(' ', ''),
+    lambda text, rng: text.translate(str.maketrans('أإآة', 'اااه')),
+    lambda text, rng: text.replace('ي', 'ى') if text.endswith('ي') else text.replace('ا', 'أ', 1),
+    lambda text, rng: text[:1] + 'ـ' + text[1:],
+    lambda text, rng: ''.join(c + rng.choice(TASHKEEL) if '\u0621' <= c <= '\u064a' and rng.random() < 0.4
+                              else c for c in text),
+    lambda text, rng: rng.choice((str.lower, str.upper, str.title))(text),
+)
+
+
+# The text as someone else might type it
+def spelling_variant(text, rng):
+    return rng.choice(VARIANTS)(text, rng)
+
+
+# Realistic-looking (full_name, dob, city) rows, reproducible per seed.
+# With noise > 0 that share of rows repeats an earlier person with the
+# name and/or city typed differently (the Latin and Arabic city names of
+# CITIES count as the same city).
+def synthetic_rows(count, seed=2026, noise=0.0):
+    rng = random.Random(seed)
+    people = []
+    for _ in range(count):
+        if noise and people and rng.random() < noise:
+            name, dob, city = rng.choice(people)
+            if rng.random() < 0.3:
+                city = CITIES[(CITIES.index(city) + len(CITIES) // 2) % len(CITIES)]
+            if rng.random() < 0.7:
+                name = spelling_variant(name, rng)
+            else:
+                city = spelling_variant(city, rng)
+            yield name, dob, city
+            continue
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        dob = f"{rng.randint(1950, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        city = rng.choice(CITIES)
+        if noise:
+            people.append((name, dob, city))
+        yield name, dob, city
+
+
+# The same input with one character moved across each field boundary
+def boundary_shifts(full_name, dob, city):
+    shifts = []
+    if full_name:
+        shifts.append((full_name[:-1], full_name[-1] + dob, city))
+    if dob:
+        shifts.append((full_name, dob[:-1], dob[-1] + city))
+    return shifts
+
+
+# Chi-square p-value, Wilson-Hilferty normal approximation
+def chi2_pvalue(chi2, df):
+    if df <= 0:
+        return 1.0
+    z = ((chi2 / df) ** (1 / 3) - (1 - 2 / (9 * df))) / math.sqrt(2 / (9 * df))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# Chi-square of observed counts against uniform draws from `items`; texts
+# listed several times (lucky_day) are expected in proportion
+def chi2_uniform(counter, items):
+    multiplicity = Counter(items)
+    total = sum(counter.values())
+    chi2 = 0.0
+    for text, weight in multiplicity.items():
+        expected = total * weight / len(items)
+        chi2 += (counter.get(text, 0) - expected) ** 2 / expected
+    df = len(multiplicity) - 1
+    return chi2, df, chi2_pvalue(chi2, df)
+
+
+# Share of n uniform draws from m outcomes expected to repeat an earlier one
+def expected_duplicate_share(n, m):
+    if not n or not m:
+        return 0.0
+    return 1 - m * -math.expm1(-n / m) / n
+
+
+_plan = None
+
+
+def _init_worker(templates_path, is_premium):
+    global _plan
+    _plan = category_plan(load_template_index(templates_path), is_premium)
+
+
+# Analyze one chunk of distinct rows in a worker process
+def _analyze_chunk(job):
+    rows, scheme, selection = job
+    histograms = {category: Counter() for category, _ in _plan}
+    readings = []
+    seeds = []
+    shifted = 0
+    for full_name, dob, city in rows:
+        seed = generate_seed(full_name, dob, city, scheme)
+        seeds.append(seed.to_bytes(32, 'big')[:16])
+        # Under scheme 3 a shift that only moves a space or mark is the
+        # same key, not a collision
+        key = input_key(full_name, dob, city) if scheme == 3 else None
+        shifted += any(generate_seed(*shift, scheme=scheme) == seed
+                       for shift in boundary_shifts(full_name, dob, city)
+                       if key is None or input_key(*shift) != key)
+        
+        insights = draw_sections(make_picker(seed, selection), _plan, {}, {'name': full_name, 'city': city})
+        digest = hashlib.blake2b(digest_size=16)
+        for category, counter in histograms.items():
+            text = insights[category]
+            counter[text] += 1
+            digest.update(text.encode('utf-8'))
+            digest.update(b'\x00')
+        readings.append(digest.digest())
+    return histograms, readings, seeds, shifted
+
+
+# Run the analysis; returns a JSON-serializable report
+def analyze(rows, templates_path='templates.json', is_premium=False, scheme=DEFAULT_SEED_SCHEME,
+            selection='legacy', workers=None, chunk_size=5000):
+    rows = list(dict.fromkeys(rows))
+    histograms = {}
+    readings = set()
+    seeds = set()
+    shifted = 0
+    
+    chunks = iter(rows)
+    jobs = iter(lambda: (list(islice(chunks, chunk_size)), scheme, selection), ([], scheme, selection))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(templates_path, is_premium)) as pool:
+        for chunk_histograms, chunk_readings, chunk_seeds, chunk_shifted in pool.map(_analyze_chunk, jobs):
+            for category, counter in chunk_histograms.items():
+                histograms.setdefault(category, Counter()).update(counter)
+            readings.update(chunk_readings)
+            seeds.update(chunk_seeds)
+            shifted += chunk_shifted
+    
+    plan = category_plan(load_template_index(templates_path), is_premium)
+    categories = {}
+    combinations = 1
+    for category, items in plan:
+        counter = histograms.get(category, Counter())
+        report = {'distinct_seen': len(counter)}
+        if isinstance(items, Composition) or not items:
+            # Composed sections have no flat list to test against
+            combinations *= max(len(items), 1)
+        else:
+            chi2, df, p = chi2_uniform(counter, items)
+            report.update(templates=len(set(items)), chi2=round(chi2, 2), df=df, p_value=round(p, 4))
+            combinations *= len(set(items))
+        categories[category] = report
+    
+    n = len(rows)
+    keys = len({input_key(*row) for row in rows})
+    names = {full_name for full_name, _, _ in rows}
+    cities = {city for _, _, city in rows}
+    return {
+        'rows': n,
+        'scheme': scheme,
+        'selection': selection,
+        'premium': is_premium,
+        'normalized_inputs': keys,
+        'normalization_collapse': round(1 - keys / n, 6) if n else 0.0,
+        'names': [len(names), len({name_key(name) for name in names})],
+        'cities': [len(cities), len({city_key(city) for city in cities})],
+        'seed_collisions': (keys if scheme == 3 else n) - len(seeds),
+        'boundary_shift_collisions': shifted,
+        'duplicate_readings': round((n - len(readings)) / n, 6) if n else 0.0,
+        'expected_duplicate_readings': round(expected_duplicate_share(n, combinations), 6),
+        'categories': categories,
+    }
+
+
+def print_report(report):
+    print(f"{report['rows']} distinct inputs, seed scheme {report['scheme']}, "
+          f"{report['selection']} selection, {'premium' if report['premium'] else 'free'}")
+    print(f"after normalization: {report['normalized_inputs']} distinct keys "
+          f"({report['normalization_collapse']:.2%} of inputs collapse; "
+          f"names {report['names'][0]} -> {report['names'][1]}, cities {report['cities'][0]} -> {report['cities'][1]})")
+    print(f"seed collisions between distinct {'keys' if report['scheme'] == 3 else 'inputs'}: "
+          f"{report['seed_collisions']}")
+    print(f"inputs colliding with a boundary-shifted copy: {report['boundary_shift_collisions']}")
+    print(f"duplicate readings: {report['duplicate_readings']:.4%} "
+          f"(uniform expectation {report['expected_duplicate_readings']:.4%})")
+    print(f"  {'category':24} {'seen':>6} {'chi2':>9} {'df':>4} {'p':>7}")
+    for category, stats in report['categories'].items():
+        if 'chi2' in stats:
+            flag = '  <- not uniform' if stats['p_value'] < 0.001 else ''
+            print(f"  {category:24} {stats['distinct_seen']:6} {stats['chi2']:9.1f} {stats['df']:4} "
+                  f"{stats['p_value']:7.4f}{flag}")
+        else:
+            print(f"  {category:24} {stats['distinct_seen']:6}   (composed)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze seed collisions and template distribution')
+    parser.add_argument('--input', help='CSV or JSONL file with name, dob, city (default: synthetic corpus)')
+    parser.add_argument('--rows', type=int, default=100000, help='size of the synthetic corpus')
+    parser.add_argument('--noise', type=float, default=0.0,
+                        help='share of synthetic rows that retype an earlier person differently')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--scheme', type=int, choices=SEED_SCHEMES, default=DEFAULT_SEED_SCHEME)
+    parser.add_argument('--selection', choices=SELECTION_MODES, default='legacy')
+    parser.add_argument('--premium', action='store_true')
+    parser.add_argument('--templates', default='templates.json')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+    
+    if args.input:
+        fmt = 'jsonl' if args.input.endswith('.jsonl') else 'csv'
+        with open(args.input, 'r', encoding='utf-8', newline='') as f:
+            rows = list(read_rows(f, fmt))
+    else:
+        rows = list(synthetic_rows(args.rows, noise=args.noise))
+    
+    report = analyze(rows, args.templates, args.premium, args.scheme, args.selection, args.workers)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+# Headless HTTP/JSON API over the same engine the Streamlit UI uses.
+#
+#   python -m insights.api --port 8600
+#
+#   GET  /v1/insights?name=...&dob=YYYY-MM-DD&city=...&premium=1
+#   POST /v1/insights          {"name": ..., "dob": ..., "city": ..., "premium": true}
+#   POST /v1/insights/batch    {"rows": [{"name": ..., "dob": ..., "city": ...}], "premium": true}
+#   GET  /v1/pdf?...           (or POST with the same JSON body) -> application/pdf
+#   GET  /v1/text?...&format=plain|markdown|whatsapp -> text/plain
+#   GET  /v1/card?...&format=png|webp -> share card image
+#   POST /v1/permalink         {"name": ..., "dob": ..., "city": ..., "premium": true} -> {"id": ...}
+#   GET  /v1/r/<id>            -> 302 to /v1/r/<id>?v=<templates version>
+#   GET  /v1/r/<id>?v=...      -> the reading (Cache-Control: immutable when
+#                                 links are persistent, INSIGHTS_PERMALINK_DB)
+#   GET  /healthz
+#
+# Readings come from cached_insights(), PDFs from create_pdf(), texts
+# from export_text() and cards from create_card(), so the output is the
+# same as in the UI. Responses carry an ETag derived from the reading and
+# its input (If-None-Match answers 304), JSON and text bodies are gzipped
+# when the client accepts it, and connections are kept alive (HTTP/1.1).
+#
+# ApiApp.handle() does not depend on the transport; the threaded server
+# below is one front end for it.
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from insights.batch import generate_insights_batch
+from insights.cache import cache_from_env, cached_insights, reading_key
+from insights.engine import generate_seed
+from insights.export import FORMATS, export_text
+from insights.metrics import CONTENT_TYPE, render_prometheus, request_span
+from insights.pdf import create_pdf, pdf_filename, reading_hash
+from insights.permalink import ID_PATTERN, permalink_store_from_env, register, resolve
+from insights.sharecard import FORMATS as CARD_FORMATS
+from insights.sharecard import card_mime_type, create_card
+from insights.store import TemplateStore, store_from_env
+
+Response = namedtuple('Response', 'status headers body')
+
+GZIP_MIN_BYTES = 512
+
+PERMALINK_PREFIX = '/v1/r/'
+# A versioned permalink always returns the same reading; it is only
+# advertised as cacheable for a year when links survive a restart
+IMMUTABLE = 'public, max-age=31536000, immutable'
+EPHEMERAL = 'public, max-age=3600'
+
+# Rows accepted by one /v1/insights/batch request
+MAX_BATCH_ROWS = int(os.environ.get('INSIGHTS_API_MAX_BATCH', 1000))
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def _json(status, payload, headers=None):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = dict(headers or {})
+    headers['Content-Type'] = 'application/json; charset=utf-8'
+    return Response(status, headers, body)
+
+
+def _error(status, message):
+    return _json(status, {'error': message})
+
+
+class ApiApp:
+    
+    # `templates` is a TemplateIndex (fixed) or a TemplateStore (hot-reloaded)
+    def __init__(self, templates=None, cache=None, permalinks=None):
+        self.templates = templates if templates is not None else store_from_env()
+        self.cache = cache if cache is not None else cache_from_env()
+        self.permalinks = permalinks if permalinks is not None else permalink_store_from_env()
+    
+    # The index for one request; read once so a reload mid-request cannot mix versions
+    def _index(self):
+        if isinstance(self.templates, TemplateStore):
+            return self.templates.current()
+        return self.templates
+    
+    # Request parameters from the query string (GET) or JSON body (POST)
+    def _params(self, method, query, body):
+        if method == 'POST':
+            try:
+                params = json.loads(body or b'{}')
+            except ValueError:
+                raise BadRequest("body must be JSON")
+            if not isinstance(params, dict):
+                raise BadRequest("body must be a JSON object")
+            return params
+        return {key: values[-1] for key, values in parse_qs(query).items()}
+    
+    def _reading_args(self, params):
+        missing = [field for field in ('name', 'dob', 'city') if not params.get(field)]
+        if missing:
+            raise BadRequest(f"missing field(s): {', '.join(missing)}")
+        invalid = [field for field in ('name', 'dob', 'city') if not isinstance(params[field], str)]
+        if invalid:
+            raise BadRequest(f"field(s) must be strings: {', '.join(invalid)}")
+        return params['name'], params['dob'], params['city'], _flag(params.get('premium', False))
+    
+    def insights(self, method, query, headers, body):
+        full_name, dob, city, is_premium = self._reading_args(self._params(method, query, body))
+        templates = self._index()
+        key = reading_key(generate_seed(full_name, dob, city), is_premium, templates.version)
+        # Weak: generated_at differs between otherwise identical readings.
+        # The input is hashed too: inputs that share a seed still differ in
+        # the name, dob and city the reading shows
+        tag = '\0'.join((key, full_name, dob, city))
+        etag = f'W/"{hashlib.sha256(tag.encode()).hexdigest()[:32]}"'
+        if headers.get('if-none-match') == etag:
+            return Response(304, {'ETag': etag}, b'')
+        reading = cached_insights(full_name, dob, city, templates, is_premium, self.cache)
+        return _json(200, reading, {'ETag': etag})
+    
+    def batch(self, method, query, headers, body):
+        if method != 'POST':
+            return _error(405, "use POST")
+        params = self._params(method, query, body)
+        rows = params.get('rows')
+        if not isinstance(rows, list):
+            raise BadRequest("'rows' must be a list")
+        if len(rows) > MAX_BATCH_ROWS:
+            raise BadRequest(f"at most {MAX_BATCH_ROWS} rows per request")
+        rows = [self._reading_args(row)[:3] if isinstance(row, dict) else None for row in rows]
+        if None in rows:
+            raise BadRequest("every row must be an object with name, dob and city")
+        readings = list(generate_insights_batch(rows, self._index(), _flag(params.get('premium', False))))
+        return _json(200, {'readings': readings})
+    
+    def pdf(self, method, query, headers, body):
+        full_name, dob, city, is_premium = self._reading_args(self._params(method, query, body))
+        templates = self._index()
+        reading = cached_insights(full_name, dob, city, templates, is_premium, self.cache)
+        etag = f'"{reading_hash(reading, is_premium)}"'
+        if headers.get('if-none-match') == etag:
+            return Response(304, {'ETag': etag}, b'')
+        data = create_pdf(reading, is_premium)
+        return Response(200, {
+            'Content-Type': 'application/pdf',
+            'Content-Disposition': f"attachment; filename*=UTF-8''{quote(pdf_filename(reading), safe='')}",
+            'ETag': etag,
+        }, data)
+    
+    def text(self, method, query, headers, body):
+        params = self._params(method, query, body)
+        full_name, dob, city, is_premium = self._reading_args(params)
+        fmt = params.get('format', 'plain')
+        if not isinstance(fmt, str) or fmt not in FORMATS:
+            raise BadRequest(f"format must be one of: {', '.join(FORMATS)}")
+        reading = cached_insights(full_name, dob, city, self._index(), is_premium, self.cache)
+        digest = reading_hash(reading, is_premium)
+        etag = f'"{digest}-{fmt}"'
+        if headers.get('if-none-match') == etag:
+            return Response(304, {'ETag': etag}, b'')
+        content_type = 'text/markdown' if fmt == 'markdown' else 'text/plain'
+        return Response(200, {
+            'Content-Type': f'{content_type}; charset=utf-8',
+            'ETag': etag,
+        }, export_text(reading, is_premium, fmt, digest).encode('utf-8'))
+    
+    def card(self, method, query, headers, body):
+        params = self._params(method, query, body)
+        full_name, dob, city, is_premium = self._reading_args(params)
+        fmt = params.get('format', 'png')
+        if not isinstance(fmt, str) or fmt not in CARD_FORMATS:
+            raise BadRequest(f"format must be one of: {', '.join(CARD_FORMATS)}")
+        templates = self._index()
+        reading = cached_insights(full_name, dob, city, templates, is_premium, self.cache)
+        etag = f'"{reading_hash(reading, is_premium)}-{fmt}"'
+        if headers.get('if-none-match') == etag:
+            return Response(304, {'ETag': etag}, b'')
+        return Response(200, {
+            'Content-Type': card_mime_type(fmt),
+            'ETag': etag,
+        }, create_card(reading, is_premium, fmt))
+    
+    def permalink(self, method, query, headers, body):
+        full_name, dob, city, is_premium = self._reading_args(self._params(method, query, body))
+        link_id = register(full_name, dob, city, is_premium, self.permalinks)
+        return _json(200, {'id': link_id, 'path': PERMALINK_PREFIX + link_id,
+                           'persistent': self.permalinks.persistent})
+    
+    # The unversioned URL redirects (briefly cacheable) to the URL of the
+    # current templates version, which can be cached for a year
+    def permalink_reading(self, link_id, query, headers):
+        if not ID_PATTERN.fullmatch(link_id):
+            return _error(404, "unknown permalink")
+        templates = self._index()
+        versioned = f"{PERMALINK_PREFIX}{link_id}?v={templates.version}"
+        if parse_qs(query).get('v', [None])[-1] != templates.version:
+            return Response(302, {'Location': versioned, 'Cache-Control': 'public, max-age=60'}, b'')
+        # Weak: the body carries its own generated_at, only the reading is fixed
+        etag = f'W/"{link_id}-{templates.version}"'
+        cache_control = IMMUTABLE if self.permalinks.persistent else EPHEMERAL
+        if headers.get('if-none-match') == etag:
+            return Response(304, {'ETag': etag, 'Cache-Control': cache_control}, b'')
+        reading = resolve(link_id, templates, self.permalinks, self.cache)
+        if reading is None:
+            return _error(404, "unknown permalink")
+        return _json(200, reading, {'ETag': etag, 'Cache-Control': cache_control})
+    
+    # Dispatch one request; headers must have lower-case names
+    def handle(self, method, target, headers, body=b''):
+        url = urlsplit(target)
+        routes = {
+            '/v1/insights': self.insights,
+            '/v1/insights/batch': self.batch,
+            '/v1/pdf': self.pdf,
+            '/v1/text': self.text,
+            '/v1/card': self.card,
+            '/v1/permalink': self.permalink,
+        }
+        if url.path == '/healthz':
+            return _json(200, {'status': 'ok', 'templates_version': self._index().version})
+        if url.path == '/metrics':
+            return Response(200, {'Content-Type': CONTENT_TYPE}, render_prometheus().encode('utf-8'))
+        route = routes.get(url.path)
+        if route is None and url.path.startswith(PERMALINK_PREFIX):
+            if method != 'GET':
+                return _error(405, "use GET")
+            link_id = url.path[len(PERMALINK_PREFIX):]
+            with request_span(f"api {PERMALINK_PREFIX}"):
+                return compress(self.permalink_reading(link_id, url.query, headers), headers)
+        if route is None:
+            return _error(404, "not found")
+        if method not in ('GET', 'POST'):
+            return _error(405, "use GET or POST")
+        try:
+            with request_span(f"api {url.path}"):
+                response = route(method, url.query, headers, body)
+        except BadRequest as e:
+            return _error(400, str(e))
+        except FileNotFoundError as e:
+            return _error(500, f"missing file: {e.filename}")
+        return compress(response, headers)
+
+
+# gzip JSON and text bodies for clients that accept it
+def compress(response, headers):
+    status, out_headers, body = response
+    if (len(body) >= GZIP_MIN_BYTES
+            and out_headers.get('Content-Type', '').startswith(('application/json', 'text/plain', 'text/markdown'))
+            and 'gzip' in headers.get('accept-encoding', '')):
+        out_headers = dict(out_headers, **{'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'})
+        body = gzip.compress(body, compresslevel=6)
+    return Response(status, out_headers, body)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY
+    # keep-alive clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+    app = None
+    
+    def _serve(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        headers = {name.lower(): value for name, value in self.headers.items()}
+        status, out_headers, payload = self.app.handle(self.command, self.path, headers, body)
+        self.send_response(status)
+        for name, value in out_headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    do_GET = _serve
+    do_POST = _serve
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=8600, app=None):
+    handler = type('InsightsHandler', (Handler,), {'app': app or ApiApp()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve readings and PDFs over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--templates', default='templates.json')
+    args = parser.parse_args(argv)
+    
+    server = make_server(args.host, args.port, ApiApp(TemplateStore(args.templates)))
+    print(f"serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# Static asset pipeline for the Streamlit UI.
+#
+#   python -m insights.assets [--font NAME=/path/font.ttf ...]
+#
+# Minifies static/app.css into static/app.min.css and, for every vendored
+# font under fonts/ (FONT_SOURCES) and every --font given, writes a WOFF2
+# subset with only the characters the app can show (templates.json,
+# app.py, the insights and insights_ui packages and static/app.css, plus
+# Basic Latin) to static/fonts/<name>.woff2, the file names
+# static/app.css refers to. The built subsets are committed; rebuild them
+# after adding characters to the templates or the UI.
+# Streamlit serves the static/ folder at app/static/ when
+# server.enableStaticServing is on (see .streamlit/config.toml), but only
+# fonts are loaded from there: Streamlit 1.29 serves .css files as
+# text/plain with nosniff, so browsers refuse a <link> to them and the
+# minified stylesheet is inlined instead (stylesheet_tag()).
+import argparse
+import os
+import re
+import shutil
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, 'static')
+CSS_SOURCE = os.path.join(STATIC_DIR, 'app.css')
+CSS_MINIFIED = os.path.join(STATIC_DIR, 'app.min.css')
+FONT_DIR = os.path.join(STATIC_DIR, 'fonts')
+VENDOR_DIR = os.path.join(ROOT, 'fonts')
+
+# static/fonts/<name>.woff2 -> vendored source font
+FONT_SOURCES = {
+    'NotoNaskhArabic-Regular': os.path.join(VENDOR_DIR, 'NotoNaskhArabic-Regular.ttf'),
+}
+FONT_LICENSE = os.path.join(VENDOR_DIR, 'OFL.txt')
+
+# URL prefix Streamlit serves static/ under
+STATIC_URL = 'app/static'
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def build_css(src=CSS_SOURCE, dst=CSS_MINIFIED):
+    with open(src, 'r', encoding='utf-8') as f:
+        css = minify_css(f.read())
+    with open(dst, 'w', encoding='utf-8') as f:
+        f.write(css)
+    return dst
+
+
+# Every character the UI can render, so font subsets never miss a glyph
+def used_characters(paths=None):
+    if paths is None:
+        paths = [os.path.join(ROOT, 'templates.json'), os.path.join(ROOT, 'app.py'), CSS_SOURCE]
+        for package in ('insights', 'insights_ui'):
+            paths += [os.path.join(ROOT, package, name) for name in os.listdir(os.path.join(ROOT, package))
+                      if name.endswith('.py')]
+    chars = set(chr(c) for c in range(0x20, 0x7F))
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            chars.update(f.read())
+    return {c for c in chars if c.isprintable()}
+
+
+def build_font(name, source, chars, out_dir=FONT_DIR):
+    from fontTools import subset as ftsubset
+    from fontTools.ttLib import TTFont
+    
+    font = TTFont(source)
+    options = ftsubset.Options(layout_features=['*'], flavor='woff2')
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(c) for c in chars])
+    subsetter.subset(font)
+    os.makedirs(out_dir, exist_ok=True)
+    dst = os.path.join(out_dir, f"{name}.woff2")
+    font.flavor = 'woff2'
+    font.save(dst)
+    shutil.copyfile(FONT_LICENSE, os.path.join(out_dir, os.path.basename(FONT_LICENSE)))
+    return dst
+
+
+# Font files static/app.css points at that are not in static/
+def missing_fonts(css_path=CSS_SOURCE):
+    with open(css_path, 'r', encoding='utf-8') as f:
+        urls = re.findall(r"url\(['\"]?([^'\")]+\.woff2)['\"]?\)", f.read())
+    return [url for url in urls if not os.path.exists(os.path.join(STATIC_DIR, url))]
+
+
+# Relative url()s in the stylesheet, which point into static/
+_RELATIVE_URL = re.compile(r"""url\((['"]?)(?!data:|[a-z]+://|/)([^'")]+)\1\)""")
+
+
+# <style> block with the minified stylesheet, read once per process.
+# Relative url()s are rewritten to STATIC_URL, so fonts still come from
+# Streamlit's static folder and stay cached by the browser.
+@lru_cache(maxsize=None)
+def stylesheet_tag():
+    if os.path.exists(CSS_MINIFIED):
+        with open(CSS_MINIFIED, 'r', encoding='utf-8') as f:
+            css = f.read()
+    else:
+        with open(CSS_SOURCE, 'r', encoding='utf-8') as f:
+            css = minify_css(f.read())
+    css = _RELATIVE_URL.sub(lambda m: f"url({m[1]}{STATIC_URL}/{m[2]}{m[1]})", css)
+    return f'<style>{css}</style>'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build minified CSS and self-hosted font subsets')
+    parser.add_argument('--font', action='append', default=[], metavar='NAME=PATH',
+                        help='extra TTF/OTF to subset into static/fonts/NAME.woff2 (builds need the brotli package)')
+    args = parser.parse_args(argv)
+    
+    dst = build_css()
+    print(f"{dst}: {os.path.getsize(dst)} bytes (source {os.path.getsize(CSS_SOURCE)})")
+    
+    fonts = dict(FONT_SOURCES)
+    for spec in args.font:
+        name, _, source = spec.partition('=')
+        fonts[name] = source
+    chars = used_characters()
+    for name, source in fonts.items():
+        dst = build_font(name, source, chars)
+        print(f"{dst}: {os.path.getsize(dst)} bytes ({len(chars)} characters, from {os.path.getsize(source)})")
+    
+    missing = missing_fonts()
+    if missing:
+        raise SystemExit(f"static/app.css refers to fonts that were not built: {', '.join(missing)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# Bulk generation for precomputed campaigns.
+#
+#   python -m insights.batch rows.csv --premium -o readings.jsonl
+#
+# Input is a CSV (or JSON Lines) file with name, dob and city columns;
+# output is one JSON reading per line, streamed as it is produced.
+import argparse
+import csv
+import json
+import random
+import sys
+from datetime import datetime
+from itertools import islice
+
+from insights.engine import SELECTION_MODES, category_plan, draw_sections, generate_seed, make_picker
+from insights.templates import load_template_index
+
+
+# Generate readings for many (full_name, dob, city) rows
+#
+# Output is identical to calling generate_insights() once per row. The
+# category plan is resolved once per batch, seeds are hashed a chunk at a
+# time, and a single random.Random is re-seeded per row instead of being
+# re-created. Readings are yielded lazily so callers can stream them.
+#
+# Index derivation stays on the seeded Mersenne Twister: deriving indices
+# with vectorized array math over the digests would give different
+# readings than the single-row path.
+def generate_insights_batch(rows, templates, is_premium=False, chunk_size=1024, selection='legacy'):
+    plan = category_plan(templates, is_premium)
+    rng = random.Random()
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        seeds = [generate_seed(full_name, dob, city) for full_name, dob, city in chunk]
+        for (full_name, dob, city), seed in zip(chunk, seeds):
+            pick = make_picker(seed, selection, rng)
+            insights = draw_sections(pick, plan, {}, {'name': full_name, 'city': city})
+            insights['name'] = full_name
+            insights['dob'] = dob
+            insights['city'] = city
+            insights['generated_at'] = generated_at
+            yield insights
+
+
+# Read (name, dob, city) rows from a CSV or JSON Lines stream
+def read_rows(f, fmt='csv'):
+    if fmt == 'jsonl':
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record['name'], record['dob'], record['city']
+        return
+    
+    reader = csv.reader(f)
+    for row in reader:
+        if not row or row[0] == 'name':
+            continue
+        yield row[0], row[1], row[2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate readings for many rows at once')
+    parser.add_argument('input', help="CSV or JSONL file with name, dob, city ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file ('-' for stdout)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None)
+    parser.add_argument('--premium', action='store_true')
+    parser.add_argument('--templates', default='templates.json')
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--selection', choices=SELECTION_MODES, default='legacy')
+    args = parser.parse_args(argv)
+    
+    fmt = args.format or ('jsonl' if args.input.endswith('.jsonl') else 'csv')
+    templates = load_template_index(args.templates)
+    
+    fin = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    fout = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        readings = generate_insights_batch(read_rows(fin, fmt), templates, args.premium,
+                                           args.chunk_size, args.selection)
+        for insights in readings:
+            fout.write(json.dumps(insights, ensure_ascii=False))
+            fout.write('\n')
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+# Compact binary template format, memory-mapped at load time.
+#
+# templates.json is parsed into nested dicts of str in every process,
+# which costs startup time and per-worker memory once categories hold
+# thousands of entries. `python -m insights.binfmt` compiles it once into
+#
+#   header     magic, templates version, category / string counts,
+#              the string holding the "fragments" section (if any)
+#   categories (section, name string, first string, count) per category
+#   offsets    n_strings + 1 little-endian uint32 offsets into the blob
+#   blob       every string, UTF-8, back to back (category names first;
+#              fragments, when present, last as one JSON string)
+#
+# load_binary_index() maps the file read-only and returns an ordinary
+# TemplateIndex whose categories are lazy sequences: an entry is decoded
+# only when a reading selects it. The mapped pages come from the page
+# cache and are shared by every worker that maps the same file, and
+# opening it costs the same for 25 entries per category as for 25,000.
+#
+# The header carries the same content hash as the JSON it was built from,
+# so reading cache keys (and readings) are identical for both formats.
+# The builder writes a temporary file and renames it into place: mapped
+# files must never be rewritten in place.
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Sequence
+from functools import lru_cache
+
+from insights.engine import read_templates
+from insights.templates import SECTION_TYPES, make_index, templates_version
+
+MAGIC = b'INSTPL\x00\x02'
+HEADER = struct.Struct('<8s16sIIII')    # magic, version, n_categories, n_strings, blob_start, fragments
+CATEGORY = struct.Struct('<BxxxIII')    # section, name string, first string, count
+OFFSET = struct.Struct('<I')
+NO_FRAGMENTS = 0xFFFFFFFF
+
+
+# Serialize a parsed templates.json dict
+def build_binary(raw):
+    names = []
+    records = []
+    strings = []
+    for section, section_type in enumerate(SECTION_TYPES):
+        for category, entries in raw.get(section_type, {}).items():
+            records.append((section, len(names), len(strings), len(entries)))
+            names.append(category)
+            strings.extend(entries)
+    # Category names live in the string table ahead of the entries
+    n_names = len(names)
+    records = [(section, name, n_names + first, count) for section, name, first, count in records]
+    strings = names + strings
+    # Compositions are compiled eagerly at load time, so they are kept as JSON
+    fragments = NO_FRAGMENTS
+    if raw.get('fragments'):
+        fragments = len(strings)
+        strings.append(json.dumps(raw['fragments'], ensure_ascii=False, separators=(',', ':')))
+    
+    offsets = [0]
+    encoded = []
+    for text in strings:
+        data = text.encode('utf-8')
+        encoded.append(data)
+        offsets.append(offsets[-1] + len(data))
+    if offsets[-1] > 0xFFFFFFFF:
+        raise ValueError("templates exceed 4 GiB")
+    
+    blob_start = HEADER.size + CATEGORY.size * len(records) + OFFSET.size * len(offsets)
+    parts = [HEADER.pack(MAGIC, templates_version(raw).encode('ascii'), len(records), len(strings), blob_start, fragments)]
+    parts.extend(CATEGORY.pack(*record) for record in records)
+    parts.append(struct.pack(f'<{len(offsets)}I', *offsets))
+    parts.extend(encoded)
+    return b''.join(parts)
+
+
+# Build `out_path` from a JSON templates file; atomic replace
+def write_binary(json_path, out_path):
+    data = build_binary(read_templates(json_path))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+# True when `path` starts with the binary magic
+def is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class TemplateFile:
+    
+    # `decoded` bounds the per-process cache of recently drawn entries
+    def __init__(self, path, decoded=4096):
+        self.path = path
+        self.string = lru_cache(maxsize=decoded)(self._decode)
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path}: truncated template file")
+        magic, version, self.n_categories, self.n_strings, self.blob_start, self.fragments = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a binary template file")
+        self.version = version.decode('ascii')
+        offsets_start = HEADER.size + CATEGORY.size * self.n_categories
+        offsets_end = offsets_start + OFFSET.size * (self.n_strings + 1)
+        if offsets_end > self.blob_start:
+            raise ValueError(f"{path}: corrupt template file")
+        # The offset table is read in place (little-endian uint32)
+        if sys.byteorder == 'little':
+            self.offsets = memoryview(self.data)[offsets_start:offsets_end].cast('I')
+        else:
+            self.offsets = struct.unpack_from(f'<{self.n_strings + 1}I', self.data, offsets_start)
+        if self.blob_start + self.offsets[self.n_strings] > len(self.data):
+            raise ValueError(f"{path}: truncated template file")
+    
+    def _decode(self, i):
+        base = self.blob_start
+        return str(self.data[base + self.offsets[i]:base + self.offsets[i + 1]], 'utf-8')
+    
+    # ((section_type, category), entries) for every category, in file order
+    def categories(self):
+        for i in range(self.n_categories):
+            section, name, first, count = CATEGORY.unpack_from(self.data, HEADER.size + CATEGORY.size * i)
+            yield (SECTION_TYPES[section], self.string(name)), Entries(self, first, count)
+
+
+# Read-only view of one category; decodes an entry per access
+class Entries(Sequence):
+    __slots__ = ('file', 'first', 'count')
+    
+    def __init__(self, file, first, count):
+        self.file = file
+        self.first = first
+        self.count = count
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, i):
+        if i.__class__ is not int:
+            if isinstance(i, slice):
+                return [self[j] for j in range(*i.indices(self.count))]
+            i = i.__index__()
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("template index out of range")
+        return self.file.string(self.first + i)
+    
+    # Process pools get a view onto their own mapping of the same file
+    def __reduce__(self):
+        return (_reopen_entries, (self.file.path, self.file.version, self.first, self.count))
+
+
+# One mapping per file per process
+@lru_cache(maxsize=8)
+def _mapped(path, version):
+    file = TemplateFile(path)
+    if file.version != version:
+        raise ValueError(f"{path} changed (version {file.version}, expected {version})")
+    return file
+
+
+def _reopen_entries(path, version, first, count):
+    return Entries(_mapped(path, version), first, count)
+
+
+# Map a binary template file as a TemplateIndex
+def load_binary_index(path):
+    file = TemplateFile(path)
+    fragments = json.loads(file.string(file.fragments)) if file.fragments != NO_FRAGMENTS else None
+    return make_index(file.version, file.categories(), fragments)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile templates.json into the binary template format')
+    parser.add_argument('templates', nargs='?', default='templates.json')
+    parser.add_argument('-o', '--output', default='templates.bin')
+    args = parser.parse_args(argv)
+    
+    size = write_binary(args.templates, args.output)
+    print(f"{args.output}: {size} bytes, version {load_binary_index(args.output).version}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+# Content-addressed cache of generated readings.
+#
+# Readings are a pure function of (seed digest, premium flag, selection
+# mode, templates version), so they can be cached under that key. The
+# in-memory tier is a bounded LRU with an optional TTL; an optional SQLite
+# tier survives restarts and is shared by every Streamlit worker process
+# pointed at the same file. Neither the `generated_at` timestamp nor the
+# caller's name, birth date and city are ever stored (nothing personal
+# reaches the SQLite file); they are stamped on the way out. Composed
+# sections are cached with their {name}/{city} slots left open
+# (compose.CONTEXT_MARKERS) and filled on the way out as well, since
+# inputs that share a seed do not share a name or city as typed.
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from insights.compose import CONTEXT_MARKERS, Composition, fill_context
+from insights.engine import category_plan, generate_insights, generate_seed
+
+
+# Per-request fields of a reading, never cached
+INPUT_FIELDS = ('name', 'dob', 'city', 'generated_at')
+
+
+# Cache key of one reading
+def reading_key(seed, is_premium, version, selection='legacy'):
+    return f"{seed:064x}:{int(bool(is_premium))}:{selection}:{version}"
+
+
+class ReadingCache:
+    
+    def __init__(self, maxsize=4096, ttl=None, db_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if db_path:
+            self._connect()
+    
+    # One SQLite connection per thread; WAL lets several processes read
+    # while one writes
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+    
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+    
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, created_at = entry
+                if not self._expired(created_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+        
+        if self.db_path:
+            row = self._connect().execute(
+                "SELECT payload, created_at FROM readings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not self._expired(row[1], now):
+                payload = json.loads(row[0])
+                self._remember(key, payload, row[1])
+                with self._lock:
+                    self.hits += 1
+                return payload
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key, payload):
+        created_at = time.time()
+        self._remember(key, payload, created_at)
+        if self.db_path:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO readings (key, payload, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(payload, ensure_ascii=False), created_at),
+            )
+            conn.commit()
+    
+    def _remember(self, key, payload, created_at):
+        with self._lock:
+            self._entries[key] = (payload, created_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    # Drop expired rows from the SQLite tier
+    def purge(self):
+        if self.db_path and self.ttl is not None:
+            conn = self._connect()
+            conn.execute("DELETE FROM readings WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.commit()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            conn = self._connect()
+            conn.execute("DELETE FROM readings")
+            conn.commit()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+# Build a ReadingCache from INSIGHTS_CACHE_SIZE / _TTL / _DB
+def cache_from_env(environ=os.environ):
+    ttl = environ.get('INSIGHTS_CACHE_TTL')
+    return ReadingCache(
+        maxsize=int(environ.get('INSIGHTS_CACHE_SIZE', 4096)),
+        ttl=float(ttl) if ttl else None,
+        db_path=environ.get('INSIGHTS_CACHE_DB') or None,
+    )
+
+
+# generate_insights() through the cache
+def cached_insights(full_name, dob, city, templates, is_premium, cache, selection='legacy', scheme=None):
+    key = reading_key(generate_seed(full_name, dob, city, scheme), is_premium, templates.version, selection)
+    payload = cache.get(key)
+    if payload is None:
+        insights = generate_insights(full_name, dob, city, templates, is_premium, selection, CONTEXT_MARKERS, scheme)
+        payload = {k: v for k, v in insights.items() if k not in INPUT_FIELDS}
+        cache.put(key, payload)
+    
+    insights = dict(payload)
+    context = {'name': full_name, 'city': city}
+    for category, items in category_plan(templates, is_premium):
+        if items.__class__ is Composition:
+            insights[category] = fill_context(insights[category], context)
+    insights['name'] = full_name
+    insights['dob'] = dob
+    insights['city'] = city
+    insights['generated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return insights
@@ -0,0 +1,75 @@
+# HTML for the result cards.
+#
+# main() used to emit every card as five st.markdown calls (open div,
+# badge, title, content, close div). Streamlit renders each call as its
+# own element, so the <div> tags never nested and every rerun sent dozens
+# of deltas. The fragments below are formatted once per reading into a
+# single HTML string for the whole result grid.
+from html import escape
+
+FREE_BADGE = '<span class="free-badge">🆓 نسخة مجانية</span>'
+PREMIUM_BADGE = '<span class="premium-badge">💎 كامل</span>'
+
+CARD = '<div class="insight-card">{badge}<div class="card-title">{title}</div><div class="card-content">{content}</div></div>'
+
+LUCKY_LINE = '<p><strong style="color: #4B2E2E;">{label}</strong> {value}</p>'
+
+HEADING = '<h2 style="text-align: center; color: #4B2E2E; margin-bottom: 30px;">🌿 رسائل خاصة لـ {name}</h2>'
+
+PREMIUM_SECTION = (
+    '<div class="premium-section">'
+    '<h2 style="color: #4B2E2E; text-align: center; margin-bottom: 25px;">💎 الإضافات الكاملة</h2>'
+    '<div class="insight-grid">{cards}</div>'
+    '</div>'
+)
+
+FREE_CARDS = (
+    ('📜 نظرة على شخصيتك', 'personality'),
+    ('🌟 نظرة على عام 2026', 'year_insight'),
+)
+
+# Row-major order of the two-column grid
+PREMIUM_CARDS = (
+    ('💎 النصيحة الذهبية', 'golden_advice'),
+    ('🎯 فرصة غير متوقعة', 'unexpected_opportunity'),
+    ('⚠️ تحدي وتحذير', 'warning_challenge'),
+    ('📅 نشاط للشهر', 'monthly_activity'),
+    ('🏆 تحدي تحفيزي', 'motivational_challenge'),
+    ('😄 نكتة مغربية', 'moroccan_joke'),
+    ('🤝 نصيحة اجتماعية', 'social_advice'),
+)
+
+LUCKY_TITLE = '✨ لمسات إضافية'
+LUCKY_ITEMS = (
+    ('🔢 الرقم السعيد:', 'lucky_number'),
+    ('📅 اليوم السعيد:', 'lucky_day'),
+    ('💬 جملة تحفيزية:', 'motivational_phrase'),
+)
+
+
+def _cards(insights, specs, badge):
+    return ''.join(
+        CARD.format(badge=badge, title=title, content=escape(str(insights.get(key, ""))))
+        for title, key in specs
+    )
+
+
+# The whole result block (heading, free grid, premium section) as one fragment
+def render_results(insights, is_premium):
+    parts = [
+        HEADING.format(name=escape(str(insights.get('name', '')))),
+        '<div class="insight-grid">',
+        _cards(insights, FREE_CARDS, FREE_BADGE),
+        '</div>',
+    ]
+    
+    if is_premium:
+        lucky = ''.join(
+            LUCKY_LINE.format(label=label, value=escape(str(insights.get(key, ""))))
+            for label, key in LUCKY_ITEMS
+        )
+        cards = (_cards(insights, PREMIUM_CARDS, PREMIUM_BADGE)
+                 + CARD.format(badge=PREMIUM_BADGE, title=LUCKY_TITLE, content=lucky))
+        parts.append(PREMIUM_SECTION.format(cards=cards))
+    
+    return ''.join(parts)
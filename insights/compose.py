@@ -0,0 +1,198 @@
+# Multi-part template composition.
+#
+# A plain category is one pick from a flat list, so readings start to
+# repeat after a few dozen users. A composed category is assembled from
+# weighted fragments instead, one pick per part, e.g.
+#
+#   "fragments": {
+#     "slots": {"month": ["يناير", "فبراير", ...]},
+#     "sections": {
+#       "golden_advice": {
+#         "parts": {
+#           "opening": ["ف{city}،", ["هاد {month}،", 3]],
+#           "body":    ["..."],
+#           "closing": ["..."]
+#         }
+#       }
+#     }
+#   }
+#
+# Each fragment is a string (weight 1) or a [text, weight] pair with an
+# integer weight. {city} and {name} are filled from the reading's input;
+# any other {slot} is drawn from fragments.slots. Parts are joined with
+# "separator" (default one space).
+#
+# Everything is compiled once, with the TemplateIndex: fragments become
+# tuples of literal pieces and slot names, and weights become ticket
+# tables. Parts and slots are drawn through the reading's picker
+# (engine.make_picker) under their own "category:part" keys, so
+# composition is deterministic per seed, honours the selection mode, and
+# costs one table lookup per part whatever the corpus size.
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from string import Formatter
+
+# Slots filled from the reading's own input
+CONTEXT_SLOTS = ('name', 'city')
+
+# Stand-ins (private-use characters) for the context slots of sections
+# that are cached for every input sharing a seed (insights/cache.py);
+# fill_context() puts the caller's input in their place
+CONTEXT_MARKERS = {'name': '\ue000', 'city': '\ue001'}
+
+
+# A section composed with CONTEXT_MARKERS as its context, filled with
+# `context`; the same text compose() gives with `context` directly
+def fill_context(text, context):
+    return text.translate({ord(marker): context.get(slot) or '' for slot, marker in CONTEXT_MARKERS.items()})
+
+
+# A part's fragments laid out as `total` tickets, fragment i owning
+# weight[i] consecutive tickets. Up to TABLE_LIMIT tickets the owner of
+# every ticket is precomputed (one array read per draw); beyond that the
+# cumulative weights are bisected.
+TABLE_LIMIT = 1 << 20
+
+
+class Tickets:
+    __slots__ = ('fragments', 'bounds', 'table', 'total')
+    
+    def __init__(self, fragments, weights):
+        self.fragments = tuple(fragments)
+        self.bounds = tuple(accumulate(weights))
+        self.total = self.bounds[-1] if self.bounds else 0
+        self.table = None
+        if self.total <= TABLE_LIMIT:
+            self.table = array('I', [i for i, weight in enumerate(weights) for _ in range(weight)])
+    
+    def __len__(self):
+        return self.total
+    
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.total
+        if not 0 <= i < self.total:
+            raise IndexError("ticket out of range")
+        if self.table is not None:
+            return self.fragments[self.table[i]]
+        return self.fragments[bisect_right(self.bounds, i)]
+
+
+# Split a fragment into (literals, slot names); plain text stays a str
+def compile_fragment(text):
+    literals = []
+    slots = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        if field is None:
+            literals.append(literal)
+            continue
+        if not field.isidentifier() or spec or conversion:
+            raise ValueError(f"bad slot {{{field}}} in fragment {text!r}")
+        literals.append(literal)
+        slots.append(field)
+    if not slots:
+        return ''.join(literals)
+    if len(literals) == len(slots):
+        literals.append('')
+    return (tuple(literals), tuple(slots))
+
+
+# `value` when it is a JSON object; ValueError naming `where` otherwise
+def _mapping(value, where):
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} must be an object")
+    return value
+
+
+# Compile a list of fragments (str or [text, weight]) into Tickets
+def compile_tickets(entries, where):
+    if not isinstance(entries, list):
+        raise ValueError(f"{where}: fragments must be a list")
+    fragments = []
+    weights = []
+    for entry in entries:
+        if isinstance(entry, str):
+            text, weight = entry, 1
+        elif isinstance(entry, list) and len(entry) == 2:
+            text, weight = entry
+        else:
+            text = weight = None
+        if not isinstance(text, str):
+            raise ValueError(f"{where}: a fragment must be a string or [text, weight], got {entry!r}")
+        if not isinstance(weight, int) or isinstance(weight, bool) or weight < 1:
+            raise ValueError(f"{where}: weight must be a positive integer, got {weight!r}")
+        fragments.append(compile_fragment(text))
+        weights.append(weight)
+    if not fragments:
+        raise ValueError(f"{where}: no fragments")
+    return Tickets(fragments, weights)
+
+
+class Composition:
+    __slots__ = ('category', 'parts', 'slots', 'separator')
+    
+    def __init__(self, category, parts, slots, separator=' '):
+        self.category = category
+        self.parts = parts
+        self.slots = slots
+        self.separator = separator
+    
+    # Number of distinct fragment combinations (slot values not counted)
+    def __len__(self):
+        count = 1
+        for _, tickets in self.parts:
+            count *= len(tickets.fragments)
+        return count
+    
+    # Assemble one section; `context` maps CONTEXT_SLOTS to the reading's input
+    def compose(self, pick, context):
+        pieces = []
+        for key, tickets in self.parts:
+            fragment = pick(key, tickets)
+            if fragment.__class__ is str:
+                pieces.append(fragment)
+                continue
+        
+            literals, slots = fragment
+            out = [literals[0]]
+            for slot, literal in zip(slots, literals[1:]):
+                value = context.get(slot)
+                if value is None:
+                    drawn = self.slots.get(slot)
+                    value = pick(*drawn) if drawn else ''
+                out.append(value)
+                out.append(literal)
+            pieces.append(''.join(out))
+        return self.separator.join(pieces)
+
+
+# Compile the "fragments" section of templates.json: {category: Composition}
+def compile_fragments(fragments):
+    if not fragments:
+        return {}
+    
+    fragments = _mapping(fragments, "fragments")
+    shared_slots = {name: compile_tickets(entries, f"slot {name}")
+                    for name, entries in _mapping(fragments.get('slots', {}), "fragments.slots").items()}
+    compositions = {}
+    for category, spec in _mapping(fragments.get('sections', {}), "fragments.sections").items():
+        spec = _mapping(spec, category)
+        parts = tuple((f"{category}:{part}", compile_tickets(entries, f"{category}.{part}"))
+                      for part, entries in _mapping(spec.get('parts', {}), f"{category}.parts").items())
+        if not parts:
+            raise ValueError(f"{category}: composition has no parts")
+        
+        used = {slot for _, tickets in parts for fragment in tickets.fragments
+                if fragment.__class__ is not str for slot in fragment[1]}
+        unknown = used - set(shared_slots) - set(CONTEXT_SLOTS)
+        if unknown:
+            raise ValueError(f"{category}: unknown slot(s) {', '.join(sorted(unknown))}")
+        # Context slots fall back to a drawn value when the input is missing
+        slots = {slot: (f"{category}:{{{slot}}}", shared_slots[slot])
+                 for slot in used if slot in shared_slots}
+        separator = spec.get('separator', ' ')
+        if not isinstance(separator, str):
+            raise ValueError(f"{category}: separator must be a string")
+        compositions[category] = Composition(category, parts, slots, separator)
+    return compositions
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import random
+from datetime import datetime
+from math import gcd
+
+from insights.compose import Composition, compile_fragments
+from insights.metrics import timed
+from insights.normalize import input_key
+
+FREE_CATEGORIES = ('personality', 'year_insight')
+
+PREMIUM_CATEGORIES = (
+    'golden_advice', 'warning_challenge', 'unexpected_opportunity',
+    'monthly_activity', 'motivational_challenge', 'social_advice',
+    'mini_quiz', 'moroccan_joke', 'motivational_phrase',
+    'lucky_number', 'lucky_day'
+)
+
+SELECTION_MODES = ('legacy', 'permutation')
+
+# Seed derivation versions, see generate_seed(). INSIGHTS_SEED_SCHEME
+# switches the default for the whole process; it changes every reading.
+SEED_SCHEMES = (1, 2, 3)
+DEFAULT_SEED_SCHEME = int(os.environ.get('INSIGHTS_SEED_SCHEME', 1))
+
+# Read templates.json without any streamlit caching
+def read_templates(path='templates.json'):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Generate deterministic seed
+#
+# Scheme 1 (existing readings) hashes the fields run together, so inputs
+# that only differ in where one field ends and the next begins, e.g.
+# ("Ali", "2000-01-011", "Fes") and ("Ali", "2000-01-01", "1Fes"), share a
+# seed. Scheme 2 length-prefixes every field under its own domain tag and
+# is injective in (full_name, dob, city). Scheme 3 frames the fields like
+# scheme 2 after insights.normalize has reduced them to their keys, so
+# spelling variants of one name and city ("أمين"/"امين", "Casablanca"/
+# "الدار البيضاء", tashkeel, spacing) share a seed and a cached reading.
+def generate_seed(full_name, dob, city, scheme=None):
+    if scheme is None:
+        scheme = DEFAULT_SEED_SCHEME
+    if scheme == 1:
+        input_string = f"{full_name}{dob}{city}"
+        hash_object = hashlib.sha256(input_string.encode('utf-8'))
+    elif scheme in (2, 3):
+        fields = (full_name, dob, city)
+        if scheme == 3:
+            fields = input_key(full_name, dob, city)
+        hash_object = hashlib.sha256(b'insights-seed/%d' % scheme)
+        for field in fields:
+            data = field.encode('utf-8')
+            hash_object.update(len(data).to_bytes(8, 'big'))
+            hash_object.update(data)
+    else:
+        raise ValueError(f"unknown seed scheme: {scheme!r}")
+    return int(hash_object.hexdigest(), 16)
+
+# Resolve the (category, items) pairs a reading draws from, in draw order
+#
+# A compiled TemplateIndex already carries both plans; raw template dicts
+# are still accepted and walked here (compiling their fragments per call).
+def category_plan(templates, is_premium=False):
+    if hasattr(templates, 'plan'):
+        return templates.plan(is_premium)
+    
+    plan = [(category, templates.get('free_sections', {}).get(category, []))
+            for category in FREE_CATEGORIES]
+    if is_premium:
+        plan += [(category, templates.get('premium_sections', {}).get(category, []))
+                 for category in PREMIUM_CATEGORIES]
+    if 'fragments' in templates:
+        compositions = compile_fragments(templates['fragments'])
+        plan = [(category, compositions.get(category, items)) for category, items in plan]
+    return plan
+
+# Legacy picker: up to 10 random draws per item, falling back to the last
+# template when all of them collide. This is what existing readings use.
+def retry_picker(rng):
+    used_indices = {}
+    
+    # Helper function to get unique random item
+    def get_unique_item(category, items):
+        if not items:
+            return ""
+        
+        used = used_indices.get(category)
+        if used is None:
+            used = used_indices[category] = set()
+        
+        max_retries = 10
+        for _ in range(max_retries):
+            index = rng.randint(0, len(items) - 1)
+            if index not in used:
+                used.add(index)
+                return items[index]
+        
+        # If all indices used, return last one
+        return items[-1]
+    
+    return get_unique_item
+
+# Multiplier of the affine permutation of range(size): `start` mod size,
+# stepped up to the next value coprime with size. size - 1 always is, so
+# this stops after a few steps (the gap to the next coprime) without a
+# table of coprimes per size.
+def _multiplier(start, size):
+    a = start % size or 1
+    while gcd(a, size) != 1:
+        a += 1
+    return a
+
+# Retry-free picker: the k-th draw from a category is
+# (a * k + b) mod size, an affine permutation of range(size) keyed by a
+# BLAKE2b hash of the seed and category name. Every draw costs O(1), the
+# first `size` draws from a category are always distinct, and no template
+# is favoured when draws would otherwise collide.
+def permutation_picker(seed):
+    keyed = hashlib.blake2b(key=seed.to_bytes(32, 'big'), digest_size=16)
+    draws = {}
+    keys = {}
+    
+    def get_unique_item(category, items):
+        size = len(items)
+        if not size:
+            return ""
+        
+        ab = keys.get(category)
+        if ab is None:
+            h = keyed.copy()
+            h.update(category.encode('utf-8'))
+            key = int.from_bytes(h.digest(), 'big')
+            ab = keys[category] = (_multiplier(key >> 64, size), key % size)
+        draw = draws.get(category, 0)
+        draws[category] = draw + 1
+        
+        a, b = ab
+        return items[(a * draw + b) % size]
+    
+    return get_unique_item
+
+# Build the item picker for one reading
+def make_picker(seed, selection='legacy', rng=None):
+    if selection == 'legacy':
+        if rng is None:
+            rng = random.Random(seed)
+        else:
+            rng.seed(seed)
+        return retry_picker(rng)
+    if selection == 'permutation':
+        return permutation_picker(seed)
+    raise ValueError(f"unknown selection mode: {selection!r}")
+
+# Draw one item per planned category; composed categories (see
+# insights/compose.py) are assembled from fragments, with `context`
+# filling their {name}/{city} slots
+def draw_sections(pick, plan, insights, context=None):
+    for category, items in plan:
+        if items.__class__ is Composition:
+            insights[category] = items.compose(pick, context or {})
+        else:
+            insights[category] = pick(category, items)
+    return insights
+
+# Generate insights
+#
+# Every call owns its own random.Random instance. The process-global
+# `random` module is never seeded, so concurrent sessions (or threads
+# in a pool) cannot overwrite each other's state. random.Random(seed)
+# produces the same sequence as random.seed(seed), so existing readings
+# are unchanged.
+#
+# selection='permutation' switches to the retry-free picker; it gives
+# different (equally deterministic) readings, so it is opt-in.
+#
+# `context` overrides what composed sections fill their {name}/{city}
+# slots with (the reading cache passes compose.CONTEXT_MARKERS); `scheme`
+# overrides DEFAULT_SEED_SCHEME (permalinks keep the scheme they were
+# created under).
+@timed('generate_insights')
+def generate_insights(full_name, dob, city, templates, is_premium=False, selection='legacy', context=None,
+                      scheme=None):
+    seed = generate_seed(full_name, dob, city, scheme)
+    pick = make_picker(seed, selection)
+    
+    if context is None:
+        context = {'name': full_name, 'city': city}
+    insights = draw_sections(pick, category_plan(templates, is_premium), {}, context)
+    
+    insights['name'] = full_name
+    insights['dob'] = dob
+    insights['city'] = city
+    insights['generated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    return insights
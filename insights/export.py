@@ -0,0 +1,125 @@
+# Plain-text, Markdown and WhatsApp exports of a reading.
+#
+# The copy text used to be assembled from multi-line f-strings on every
+# render, with the source indentation leaking into the output. Here the
+# layout below is compiled once per (format, premium) into a single
+# str.format template, so an export is one format_map() over the escaped
+# values; finished texts are cached by reading hash and format, and
+# nothing is built until a button or API call asks for it.
+import os
+from functools import lru_cache
+from urllib.parse import quote
+
+from insights.cache import ReadingCache
+from insights.metrics import timed
+from insights.pdf import reading_hash
+
+# Blocks are separated by a blank line. Lines are (kind, label, insights
+# key); kind picks the line style of the format.
+FREE_BLOCKS = (
+    (('title', "🌿 الرسائل الشخصية لـ ", 'name'),),
+    (('heading', "📜 نظرة على شخصيتك", None), ('text', "", 'personality')),
+    (('heading', "🌟 نظرة على عام 2026", None), ('text', "", 'year_insight')),
+)
+
+PREMIUM_BLOCKS = (
+    (
+        ('heading', "💎 الإضافات الكاملة", None),
+        ('item', "💎 النصيحة الذهبية", 'golden_advice'),
+        ('item', "⚠️ تحدي وتحذير", 'warning_challenge'),
+        ('item', "🎯 فرصة غير متوقعة", 'unexpected_opportunity'),
+        ('item', "📅 نشاط للشهر", 'monthly_activity'),
+        ('item', "🏆 تحدي تحفيزي", 'motivational_challenge'),
+        ('item', "🤝 نصيحة اجتماعية", 'social_advice'),
+        ('item', "😄 نكتة مغربية", 'moroccan_joke'),
+        ('heading', "✨ لمسات إضافية", None),
+        ('bullet', "الرقم السعيد", 'lucky_number'),
+        ('bullet', "اليوم السعيد", 'lucky_day'),
+        ('bullet', "جملة تحفيزية", 'motivational_phrase'),
+    ),
+)
+
+# Line styles per format; {label} and {value} are filled at compile time
+# (the value becomes a {key} field of the compiled template)
+FORMATS = {
+    'plain': {
+        'title': "{label}{value}",
+        'heading': "{label}:",
+        'text': "{value}",
+        'item': "{label}: {value}",
+        'bullet': "   • {label}: {value}",
+    },
+    'markdown': {
+        'title': "# {label}{value}",
+        'heading': "## {label}",
+        'text': "{value}",
+        'item': "**{label}:** {value}",
+        'bullet': "- **{label}:** {value}",
+    },
+    'whatsapp': {
+        'title': "*{label}{value}*",
+        'heading': "*{label}*",
+        'text': "{value}",
+        'item': "*{label}:* {value}",
+        'bullet': "• {label}: {value}",
+    },
+}
+
+_MARKDOWN_SPECIAL = str.maketrans({c: '\\' + c for c in '\\`*_[]#<>|'})
+
+
+def _escape(fmt, value):
+    value = str(value)
+    if fmt == 'markdown':
+        return value.translate(_MARKDOWN_SPECIAL)
+    return value
+
+
+# One template string and the insights keys it uses, per (format, premium)
+@lru_cache(maxsize=None)
+def compile_export(fmt, is_premium):
+    styles = FORMATS[fmt]
+    blocks = FREE_BLOCKS + (PREMIUM_BLOCKS if is_premium else ())
+    keys = []
+    rendered = []
+    for block in blocks:
+        lines = []
+        for kind, label, key in block:
+            label = label.replace('{', '{{').replace('}', '}}')
+            value = ''
+            if key is not None:
+                value = '{' + key + '}'
+                keys.append(key)
+            lines.append(styles[kind].format(label=label, value=value))
+        rendered.append('\n'.join(lines))
+    return '\n\n'.join(rendered), tuple(keys)
+
+
+def render_export(insights, is_premium, fmt='plain'):
+    template, keys = compile_export(fmt, bool(is_premium))
+    return template.format_map({key: _escape(fmt, insights.get(key, '')) for key in keys})
+
+
+_texts = ReadingCache(maxsize=int(os.environ.get('INSIGHTS_EXPORT_CACHE_SIZE', 1024)))
+
+
+# Cached export of a reading; `fmt` is one of FORMATS. Hashing the reading
+# costs more than rendering it, so callers that already have the
+# reading_hash() pass it as `digest`.
+@timed('export_text')
+def export_text(insights, is_premium, fmt='plain', digest=None, cache=_texts):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    if digest is None:
+        digest = reading_hash(insights, is_premium)
+    key = f"{digest}:{fmt}"
+    text = cache.get(key)
+    if text is None:
+        text = render_export(insights, is_premium, fmt)
+        cache.put(key, text)
+    return text
+
+
+# wa.me link that opens WhatsApp with `text` ready to send
+def whatsapp_link(text):
+    return 'https://wa.me/?text=' + quote(text, safe='')
@@ -0,0 +1,95 @@
+# Background PDF rendering.
+#
+# Exports are submitted to a bounded thread (or process) pool instead of
+# rendering inside the Streamlit script thread. Jobs are keyed by reading
+# hash: a reading that is already rendered completes immediately from the
+# PDF memo, and identical requests in flight share one future. When more
+# than `max_pending` distinct renders are queued, submit() raises
+# QueueFull so callers can ask the user to retry instead of piling up work.
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from insights import pdf
+
+
+class QueueFull(Exception):
+    pass
+
+
+class RenderPool:
+    
+    def __init__(self, max_workers=2, max_pending=16, use_processes=False, memo=None):
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor = executor_class(max_workers=max_workers)
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self.memo = memo if memo is not None else pdf._memo
+        self._inflight = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+    
+    # Queue a render and return its job key (the reading hash)
+    def submit(self, insights, is_premium):
+        key = pdf.reading_hash(insights, is_premium)
+        if self.memo.get(key) is not None:
+            return key
+        
+        with self._lock:
+            if key in self._inflight:
+                return key
+            if len(self._inflight) >= self.max_pending:
+                raise QueueFull(f"{len(self._inflight)} PDF renders already pending")
+            # Plain dict: process-pool workers need picklable arguments
+            future = self.executor.submit(pdf.render_pdf, dict(insights), is_premium)
+            self._inflight[key] = future
+        
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return key
+    
+    def _finish(self, key, future):
+        failed = future.cancelled() or future.exception() is not None
+        if not failed:
+            self.memo.put(key, future.result())
+        with self._lock:
+            self._inflight.pop(key, None)
+            if failed:
+                self._failed[key] = future
+    
+    # Future of a job; completed futures come straight from the memo
+    def future(self, key):
+        data = self.memo.get(key)
+        if data is not None:
+            done = Future()
+            done.set_result(data)
+            return done
+        with self._lock:
+            return self._inflight.get(key) or self._failed.get(key)
+    
+    # Rendered bytes if the job is done, None while it is still running.
+    # Re-raises the render error of a failed job.
+    def poll(self, key):
+        future = self.future(key)
+        if future is None:
+            raise KeyError(key)
+        if not future.done():
+            return None
+        with self._lock:
+            self._failed.pop(key, None)
+        return future.result()
+    
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
+    
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+# Build a RenderPool from INSIGHTS_PDF_WORKERS / _QUEUE / _PROCESSES
+def pool_from_env(environ=os.environ):
+    return RenderPool(
+        max_workers=int(environ.get('INSIGHTS_PDF_WORKERS', 2)),
+        max_pending=int(environ.get('INSIGHTS_PDF_QUEUE', 16)),
+        use_processes=environ.get('INSIGHTS_PDF_PROCESSES', '') in ('1', 'true', 'yes'),
+    )
@@ -0,0 +1,274 @@
+# In-process timing histograms and slow-request profiles.
+#
+#   with span('generate'):            # time a block
+#   @timed('render_pdf')              # time every call of a function
+#   with request_span('rerun'):       # time a whole request / script run
+#
+# Every span name gets a fixed-bucket histogram; an observation is one
+# bisect and two additions on a per-thread shard, no lock.
+# render_prometheus() returns them in the Prometheus text format; the HTTP
+# API serves it on /metrics and serve_metrics() runs a stand-alone
+# endpoint for the Streamlit process. Set INSIGHTS_METRICS=0 to turn
+# spans into no-ops.
+#
+# With INSIGHTS_PROFILE_DIR set, request_span() also runs a sampling
+# profiler on the request's thread: a background thread records its stack
+# every INSIGHTS_PROFILE_INTERVAL_MS (default 5) while the request runs.
+# The INSIGHTS_PROFILE_KEEP (default 10) slowest requests are kept as
+# folded-stack files (flamegraph.pl / speedscope input) named
+# <span>-<ms>ms-<time>.folded; faster ones are deleted as slower arrive.
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ENABLED = os.environ.get('INSIGHTS_METRICS', '1') != '0'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# Observations go to a per-thread shard (bucket counts + sum) without a
+# lock; snapshot() adds the shards up. Shards of finished threads are
+# folded into `_base` whenever a new thread starts observing, so script
+# threads that come and go do not pile up.
+class Histogram:
+    __slots__ = ('_local', '_shards', '_base', '_lock')
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._base = [0] * (len(BUCKETS) + 1) + [0.0]
+        self._lock = threading.Lock()
+    
+    def _new_shard(self):
+        shard = self._local.shard = [0] * (len(BUCKETS) + 1) + [0.0]
+        with self._lock:
+            live = []
+            for thread, other in self._shards:
+                if thread.is_alive():
+                    live.append((thread, other))
+                else:
+                    self._base = [a + b for a, b in zip(self._base, other)]
+            live.append((threading.current_thread(), shard))
+            self._shards = live
+        return shard
+    
+    def observe(self, seconds):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(BUCKETS, seconds)] += 1
+        shard[-1] += seconds
+    
+    # (cumulative bucket counts, sum, count)
+    def snapshot(self):
+        with self._lock:
+            totals = list(self._base)
+            for _, shard in self._shards:
+                totals = [a + b for a, b in zip(totals, shard)]
+        cumulative = []
+        running = 0
+        for n in totals[:-1]:
+            running += n
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(name):
+    h = _histograms.get(name)
+    if h is None:
+        with _histograms_lock:
+            h = _histograms.setdefault(name, Histogram())
+    return h
+
+
+def observe(name, seconds):
+    if ENABLED:
+        histogram(name).observe(seconds)
+
+
+class span:
+    __slots__ = ('name', 'start')
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+
+
+def timed(name):
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    lines = [
+        '# HELP insights_span_seconds Time spent in instrumented spans.',
+        '# TYPE insights_span_seconds histogram',
+    ]
+    for name in sorted(_histograms):
+        cumulative, total, count = _histograms[name].snapshot()
+        label = _label(name)
+        for bound, n in zip(BUCKETS, cumulative):
+            lines.append(f'insights_span_seconds_bucket{{span="{label}",le="{bound}"}} {n}')
+        lines.append(f'insights_span_seconds_bucket{{span="{label}",le="+Inf"}} {cumulative[-1]}')
+        lines.append(f'insights_span_seconds_sum{{span="{label}"}} {total:.6f}')
+        lines.append(f'insights_span_seconds_count{{span="{label}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+class SlowRequestProfiler:
+    
+    def __init__(self, directory, keep=10, interval=0.005):
+        self.directory = directory
+        self.keep = keep
+        self.interval = interval
+        self._active = {}
+        self._slowest = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample, name='insights-profiler', daemon=True)
+            self._thread.start()
+    
+    # Sampler thread: sleeps while no request is being profiled
+    def _sample(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[self._folded(frame)] += 1
+    
+    @staticmethod
+    def _folded(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+    
+    def begin(self):
+        stacks = Counter()
+        with self._lock:
+            self._active[threading.get_ident()] = stacks
+            self._start()
+        self._wake.set()
+        return stacks
+    
+    def end(self, name, seconds, stacks):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if not stacks or (len(self._slowest) >= self.keep and seconds <= self._slowest[0][0]):
+                return None
+            safe = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+            path = os.path.join(self.directory, f"{safe}-{seconds * 1e3:.0f}ms-{time.time():.3f}.folded")
+            heapq.heappush(self._slowest, (seconds, path))
+            evicted = heapq.heappop(self._slowest)[1] if len(self._slowest) > self.keep else None
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, samples in stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+        if evicted is not None:
+            try:
+                os.unlink(evicted)
+            except OSError:
+                pass
+        return path
+
+
+def profiler_from_env():
+    directory = os.environ.get('INSIGHTS_PROFILE_DIR')
+    if not directory:
+        return None
+    return SlowRequestProfiler(
+        directory,
+        keep=int(os.environ.get('INSIGHTS_PROFILE_KEEP', 10)),
+        interval=float(os.environ.get('INSIGHTS_PROFILE_INTERVAL_MS', 5)) / 1e3,
+    )
+
+
+PROFILER = profiler_from_env()
+
+
+# A span around a whole request or script run, profiled when enabled
+class request_span(span):
+    __slots__ = ('stacks',)
+    
+    def __enter__(self):
+        self.stacks = PROFILER.begin() if PROFILER is not None else None
+        return span.__enter__(self)
+    
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        observe(self.name, seconds)
+        if self.stacks is not None:
+            PROFILER.end(self.name, seconds, self.stacks)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+# Serve /metrics from a daemon thread (for processes without an HTTP API)
+def serve_metrics(port, host='127.0.0.1'):
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='insights-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,156 @@
+# Input normalization for seeding (seed scheme 3).
+#
+#   name_key(' أَمِينْ  ')      -> 'امين'
+#   city_key('Casablanca')     -> 'الدارالبيضاء'  (same as city_key('الدار البيضاء'))
+#
+# People type the same name and city in many ways: with or without
+# tashkeel, tatweel, hamza on the alef, ta marbuta or ha, alef maqsura or
+# ya, Persian kaf/ya from some keyboards, Arabic-Indic digits, invisible
+# direction marks, extra or missing spaces ("الدار البيضاء" /
+# "الدارالبيضاء"), Latin case and accents ("Fès" / "fes"), or the Latin
+# name of the city altogether ("Casablanca"). Schemes 1 and 2 hash the
+# bytes as typed, so each of these is a different reading and a different
+# cache entry.
+#
+# A key is built in three C-speed passes: NFKD (splits hamza/madda
+# letters, presentation forms and accented Latin letters into base letter
+# + mark), one str.translate() through a table compiled at import (drops
+# marks, tatweel and format characters, folds letter variants and digits,
+# turns separators into spaces), and casefold(). Whitespace is then
+# removed altogether. City keys also go through an alias index (Latin and
+# colloquial names of Moroccan cities -> the key of their Arabic name).
+# Birth dates are not folded, only brought to YYYY-MM-DD (dob_key()).
+#
+# Keys are only ever hashed; readings still show the input as typed.
+import re
+import unicodedata
+from functools import lru_cache
+
+# Combining marks: Latin diacritics, Arabic tashkeel and Quranic marks,
+# and the hamza/madda marks NFKD splits off أ إ آ ؤ ئ
+_MARKS = [
+    (0x0300, 0x036F), (0x0610, 0x061A), (0x064B, 0x065F), (0x0670, 0x0670),
+    (0x06D6, 0x06ED), (0x08D3, 0x08FF), (0xFE20, 0xFE2F),
+]
+# Invisible format characters: ZWSP/ZWNJ/ZWJ, LRM/RLM, ALM, bidi
+# embeddings and isolates, BOM, soft hyphen; and tatweel
+_DROPPED = [
+    (0x200B, 0x200F), (0x202A, 0x202E), (0x2066, 0x2069), (0x061C, 0x061C),
+    (0xFEFF, 0xFEFF), (0x00AD, 0x00AD), (0x0640, 0x0640),
+]
+_FOLDED = {
+    'ٱ': 'ا',                        # alef wasla
+    'ى': 'ي', 'ی': 'ي', 'ې': 'ي',   # alef maqsura, Persian/Pashto ya
+    'ة': 'ه',
+    'ک': 'ك', 'ڪ': 'ك',
+    'گ': 'ك', 'ڭ': 'ك',             # Maghrebi gaf, spelled ك in standard Arabic
+    'ڤ': 'ف', 'ۋ': 'و',
+    "'": '', '’': '', '`': '', 'ʼ': '',
+    '-': ' ', '_': ' ', '.': ' ', ',': ' ', '،': ' ', '/': ' ',
+}
+
+
+def _compile_table():
+    table = {}
+    for first, last in _MARKS + _DROPPED:
+        for code in range(first, last + 1):
+            table[code] = None
+    for start in (0x0660, 0x06F0):  # Arabic-Indic and Persian digits
+        for digit in range(10):
+            table[start + digit] = str(digit)
+    table.update(str.maketrans(_FOLDED))
+    return table
+
+
+_TABLE = _compile_table()
+
+
+# Name/city text reduced to its seeding key
+def fold(text):
+    return ''.join(unicodedata.normalize('NFKD', text).translate(_TABLE).casefold().split())
+
+
+# Moroccan cities: Arabic name as shown -> other ways people write it.
+# Spacing, case, accents, hamza and ta marbuta variants need no entry.
+CITY_ALIASES = {
+    'الدار البيضاء': ('Casablanca', 'Casa', 'Dar el Beida', 'Dar Beida', 'كازا', 'كازابلانكا', 'البيضاء'),
+    'الرباط': ('Rabat', 'رباط'),
+    'فاس': ('Fes', 'Fez'),
+    'مراكش': ('Marrakech', 'Marrakesh', 'Marrakch', 'Marakech', 'مراكيش'),
+    'طنجة': ('Tanger', 'Tangier', 'Tangiers', 'Tanja', 'طانجة'),
+    'أكادير': ('Agadir',),
+    'مكناس': ('Meknes', 'Meknas', 'مكناسة'),
+    'وجدة': ('Oujda', 'Ujda'),
+    'القنيطرة': ('Kenitra', 'Knitra'),
+    'تطوان': ('Tetouan', 'Tetuan', 'Titouan'),
+    'آسفي': ('Safi', 'Asfi'),
+    'الجديدة': ('El Jadida', 'Jadida'),
+    'الناظور': ('Nador', 'ناظور'),
+    'بني ملال': ('Beni Mellal', 'Beni Mallal'),
+    'خريبكة': ('Khouribga',),
+    'سلا': ('Sale', 'Sla'),
+    'المحمدية': ('Mohammedia', 'Mohammadia'),
+    'الصويرة': ('Essaouira', 'Souira'),
+    'العيون': ('Laayoune', 'Layoune', 'El Aaiun'),
+    'الداخلة': ('Dakhla',),
+    'تازة': ('Taza',),
+    'سطات': ('Settat',),
+    'الرشيدية': ('Errachidia', 'Rachidia'),
+    'ورزازات': ('Ouarzazate', 'Warzazat'),
+    'شفشاون': ('Chefchaouen', 'Chaouen', 'Chefchaouene', 'الشاون'),
+    'العرائش': ('Larache',),
+    'القصر الكبير': ('Ksar El Kebir', 'Ksar Lkbir'),
+    'كلميم': ('Guelmim', 'Goulimine'),
+    'برشيد': ('Berrechid',),
+    'تمارة': ('Temara',),
+    'الخميسات': ('Khemisset',),
+    'تارودانت': ('Taroudant',),
+    'إفران': ('Ifrane',),
+    'الحسيمة': ('Al Hoceima', 'Hoceima', 'El Hoceima'),
+}
+
+
+# folded alias -> folded Arabic name
+@lru_cache(maxsize=None)
+def city_index():
+    index = {}
+    for city, aliases in CITY_ALIASES.items():
+        key = fold(city)
+        index[key] = key
+        for alias in aliases:
+            index.setdefault(fold(alias), key)
+    return index
+
+
+@lru_cache(maxsize=4096)
+def name_key(full_name):
+    return fold(full_name)
+
+
+@lru_cache(maxsize=4096)
+def city_key(city):
+    key = fold(city)
+    return city_index().get(key, key)
+
+
+_DIGITS = {code: digit for code, digit in _TABLE.items() if digit is not None and digit.isdigit()}
+_DATE = re.compile(r'(\d{4})\D(\d{1,2})\D(\d{1,2})')
+
+
+# A birth date as YYYY-MM-DD when it reads as year, month, day
+# ("2001-1-11", "٢٠٠١/٠١/١١"); anything else only loses Arabic-Indic
+# digits and surrounding spaces. Separators are never dropped, so
+# "2001-1-11" and "2001-11-1" stay apart.
+def dob_key(dob):
+    dob = dob.translate(_DIGITS).strip()
+    match = _DATE.fullmatch(dob)
+    if match is None:
+        return dob
+    year, month, day = match.groups()
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+# The seeding key of an input row
+@lru_cache(maxsize=4096)
+def input_key(full_name, dob, city):
+    return name_key(full_name), dob_key(dob), city_key(city)
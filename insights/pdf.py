@@ -0,0 +1,219 @@
+# PDF export.
+#
+# The old create_pdf() built a fresh FPDF per click, re-parsed the TTF and
+# laid every section out from inline code. Here the font is subset once
+# per process (and the subset file reused across processes), the page
+# layout is compiled once into a flat tuple of drawing ops, and finished
+# documents are memoized by reading hash.
+#
+# fpdf2 (and fontTools) take a few hundred milliseconds to import, so they
+# are imported on the first render: processes that only hash readings or
+# name files never pay for them.
+#
+# Arabic is shaped and put in visual order before drawing (see
+# insights/shaping.py); wrapped paragraphs are drawn line by line.
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from insights.metrics import timed
+from insights.shaping import SHAPER, shape
+
+# Any TTF with Arabic coverage; by default the Noto Naskh Arabic font
+# vendored under fonts/, found next to the package whatever the working
+# directory. The family is not called 'Arial' because fpdf2 treats that
+# name as a core (Latin-1 only) font and ignores add_font().
+VENDORED_FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'fonts', 'NotoNaskhArabic-Regular.ttf')
+FONT_PATH = os.environ.get('INSIGHTS_PDF_FONT', VENDORED_FONT)
+FONT_FAMILY = 'InsightsArabic'
+
+# Arabic, Arabic Supplement, presentation forms A/B, Latin and punctuation
+FONT_RANGES = (
+    (0x0020, 0x007E), (0x00A0, 0x00FF), (0x0600, 0x06FF), (0x0750, 0x077F),
+    (0xFB50, 0xFDFF), (0xFE70, 0xFEFF), (0x2000, 0x206F),
+)
+
+# Drawing ops: (kind, font size, label, insights key, align, gap after);
+# kind is 'cell', 'multi' (wrapped text) or 'gap' (vertical space only)
+HEADER = (
+    ('cell', 18, "🌿 الرسائل الشخصية المغربية 2026", None, 'C', 10),
+    ('cell', 12, "الاسم: ", 'name', 'R', 0),
+    ('cell', 12, "تاريخ الميلاد: ", 'dob', 'R', 0),
+    ('cell', 12, "المدينة: ", 'city', 'R', 15),
+    ('cell', 14, "📜 نظرة على شخصيتك", None, 'R', 0),
+    ('multi', 12, "", 'personality', 'R', 10),
+    ('cell', 14, "🌟 نظرة على عام 2026", None, 'R', 0),
+    ('multi', 12, "", 'year_insight', 'R', 10),
+)
+
+PREMIUM_ITEMS = (
+    ('💎 النصيحة الذهبية', 'golden_advice'),
+    ('⚠️ تحدي وتحذير', 'warning_challenge'),
+    ('🎯 فرصة غير متوقعة', 'unexpected_opportunity'),
+    ('📅 نشاط مقترح للشهر', 'monthly_activity'),
+    ('🏆 تحدي تحفيزي', 'motivational_challenge'),
+    ('🤝 نصيحة للتفاعل الاجتماعي', 'social_advice'),
+)
+
+PREMIUM = (
+    ('cell', 16, "💎 الإضافات الكاملة", None, 'C', 5),
+) + tuple(
+    op for title, key in PREMIUM_ITEMS
+    for op in (('cell', 14, title, None, 'R', 0), ('multi', 12, "", key, 'R', 5))
+) + (
+    ('cell', 14, "😄 فقرة ترفيهية", None, 'R', 0),
+    ('multi', 12, "نكتة مغربية: ", 'moroccan_joke', 'R', 5),
+    ('multi', 12, "جملة تحفيزية: ", 'motivational_phrase', 'R', 5),
+    ('cell', 14, "🍀 لمسات إضافية", None, 'R', 0),
+    ('cell', 12, "الرقم السعيد: ", 'lucky_number', 'R', 0),
+    ('cell', 12, "اليوم السعيد: ", 'lucky_day', 'R', 10),
+)
+
+FOOTER = (
+    ('gap', 0, "", None, '', 10),
+    ('multi', 10, "⚠️ هاد المحتوى للترفيه فقط. الرسائل تولد خوارزمياً ولا تعتمد على أي مبادئ علمية أو تنبؤية.", None, 'C', 0),
+)
+
+
+# Subset the font to FONT_RANGES once; returns (subset path, supported chars)
+#
+# The subset lands in the temp directory under a name derived from the
+# source file, so other worker processes find it already built.
+@lru_cache(maxsize=None)
+def load_font(path=FONT_PATH):
+    from fontTools import subset as ftsubset
+    from fontTools.ttLib import TTFont
+    
+    with open(path, 'rb') as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()[:16]
+    subset_path = os.path.join(tempfile.gettempdir(), f"insights-font-{digest}.ttf")
+    
+    if not os.path.exists(subset_path):
+        font = TTFont(path, recalcTimestamp=False)
+        options = ftsubset.Options(notdef_outline=True, layout_features=['*'])
+        subsetter = ftsubset.Subsetter(options)
+        subsetter.populate(unicodes=[c for lo, hi in FONT_RANGES for c in range(lo, hi + 1)])
+        subsetter.subset(font)
+        tmp_path = f"{subset_path}.{os.getpid()}"
+        font.save(tmp_path)
+        os.replace(tmp_path, subset_path)
+    
+    charset = frozenset(TTFont(subset_path, lazy=True).getBestCmap())
+    return subset_path, charset
+
+
+# Drop characters the font cannot draw (emoji, mostly) instead of letting
+# fpdf2 warn about missing glyphs on every export
+def _printable(text, charset):
+    if all(ord(c) in charset or c in '\n\r' for c in text):
+        return text
+    return ''.join(c for c in text if ord(c) in charset or c in '\n\r').strip()
+
+
+# Compile the op tuples once per font: cell labels are shaped and
+# filtered; paragraph labels stay logical, they are wrapped with the value
+@lru_cache(maxsize=None)
+def _layout(is_premium, charset):
+    ops = HEADER + (PREMIUM if is_premium else ()) + FOOTER
+    return tuple((kind, size, _printable(shape(label), charset) if kind == 'cell' else label, key, align, gap)
+                 for kind, size, label, key, align, gap in ops)
+
+
+@timed('render_pdf')
+def render_pdf(insights, is_premium, font_path=FONT_PATH, shaper=SHAPER):
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+    
+    subset_path, charset = load_font(font_path)
+    
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.add_font(FONT_FAMILY, '', subset_path)
+    
+    def measure(text):
+        return pdf.get_string_width(_printable(text, charset))
+    
+    current_size = None
+    for kind, size, label, key, align, gap in _layout(bool(is_premium), charset):
+        if kind == 'gap':
+            pdf.ln(gap)
+            continue
+        if size != current_size:
+            pdf.set_font(FONT_FAMILY, size=size)
+            current_size = size
+        value = str(insights.get(key, '')) if key is not None else ''
+        if kind == 'cell':
+            # Right-to-left: the label ends up on the right of the value
+            text = _printable(shaper(value), charset) + label if value else label
+            pdf.cell(200, 10, text, align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        else:
+            for line in shaper.lines(value, pdf.epw, measure, (font_path, size), label):
+                pdf.cell(0, 10, _printable(line, charset), align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        if gap:
+            pdf.ln(gap)
+    
+    return bytes(pdf.output())
+
+
+# Download name of an exported reading
+def pdf_filename(insights):
+    return f"الرسائل_الشخصية_{insights['name']}_2026.pdf"
+
+
+# Hash of everything that ends up in the document (generated_at excluded)
+def reading_hash(insights, is_premium):
+    content = {k: v for k, v in insights.items() if k != 'generated_at'}
+    content['__premium__'] = bool(is_premium)
+    canonical = json.dumps(content, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+# LRU of finished documents, bounded by total size in bytes
+class PdfMemo:
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+    
+    def put(self, key, data):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+_memo = PdfMemo(int(os.environ.get('INSIGHTS_PDF_CACHE_BYTES', 64 * 1024 * 1024)))
+
+
+# Create PDF export (memoized by reading hash)
+@timed('create_pdf')
+def create_pdf(insights, is_premium, memo=_memo):
+    key = reading_hash(insights, is_premium)
+    data = memo.get(key)
+    if data is None:
+        data = render_pdf(insights, is_premium)
+        memo.put(key, data)
+    return data
@@ -0,0 +1,135 @@
+# Permalinks: short, stable IDs for readings.
+#
+#   link_id = register(full_name, dob, city, is_premium, store)   # 'Xq3v0bW9mC1k'
+#   insights = resolve(link_id, templates, store, cache)          # or None
+#
+# The ID is a 72-bit hash of the generate_seed() digest, the premium flag
+# and the input as typed, base64url-encoded, so the same input always gets
+# the same link and the link reveals nothing about the input. Inputs that
+# share a seed (a boundary shift under scheme 1, spelling variants under
+# scheme 3) get links of their own, each showing the name, birth date and
+# city its sharer typed. A seed cannot be turned
+# back into a reading (the reading shows the name, birth date and city),
+# so register() keeps the inputs, and the seed scheme they were hashed
+# under, in a PermalinkStore; resolve() reads them back and goes through
+# cached_insights(), which serves the reading itself from the reading
+# cache. A link keeps its reading when INSIGHTS_SEED_SCHEME changes.
+#
+# Links are never evicted. Without INSIGHTS_PERMALINK_DB they live in
+# process memory and are gone after a restart (and not shared between
+# worker processes); with it they are rows of a SQLite table.
+#
+# A link always shows the current templates; HTTP front ends that want a
+# long max-age put the templates version in the URL (see insights/api.py).
+import base64
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from insights.cache import cached_insights
+from insights.engine import DEFAULT_SEED_SCHEME, generate_seed
+
+ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{12}')
+
+
+class PermalinkStore:
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if db_path:
+            self._connect()
+    
+    # Whether links survive a restart
+    @property
+    def persistent(self):
+        return bool(self.db_path)
+    
+    # One SQLite connection per thread, as in insights/cache.py
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS permalinks ("
+                " id TEXT PRIMARY KEY,"
+                " inputs TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+    
+    def get(self, link_id):
+        if not self.db_path:
+            return self._entries.get(link_id)
+        row = self._connect().execute("SELECT inputs FROM permalinks WHERE id = ?", (link_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+    
+    # Store `entry` under `link_id` unless the ID is taken
+    def add(self, link_id, entry):
+        if not self.db_path:
+            with self._lock:
+                self._entries.setdefault(link_id, entry)
+            return
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR IGNORE INTO permalinks (id, inputs, created_at) VALUES (?, ?, ?)",
+            (link_id, json.dumps(entry, ensure_ascii=False), time.time()),
+        )
+        conn.commit()
+    
+    def __len__(self):
+        if not self.db_path:
+            return len(self._entries)
+        return self._connect().execute("SELECT COUNT(*) FROM permalinks").fetchone()[0]
+
+
+# Build a PermalinkStore from INSIGHTS_PERMALINK_DB
+def permalink_store_from_env(environ=os.environ):
+    return PermalinkStore(environ.get('INSIGHTS_PERMALINK_DB') or None)
+
+
+def permalink_id(seed, is_premium, full_name, dob, city):
+    h = hashlib.blake2b(seed.to_bytes(32, 'big') + bytes([bool(is_premium)]),
+                        digest_size=9, person=b'insights-link')
+    h.update(json.dumps([full_name, dob, city], ensure_ascii=False).encode('utf-8'))
+    return base64.urlsafe_b64encode(h.digest()).decode('ascii')
+
+
+# Record the inputs behind a link and return its ID. The first inputs
+# registered under an ID are kept, so an existing link never changes.
+def register(full_name, dob, city, is_premium, store, scheme=None):
+    if scheme is None:
+        scheme = DEFAULT_SEED_SCHEME
+    seed = generate_seed(full_name, dob, city, scheme)
+    link_id = permalink_id(seed, is_premium, full_name, dob, city)
+    store.add(link_id, {'name': full_name, 'dob': dob, 'city': city, 'premium': bool(is_premium), 'scheme': scheme})
+    return link_id
+
+
+# (full_name, dob, city, is_premium, scheme) behind a link, or None
+def lookup(link_id, store):
+    if not ID_PATTERN.fullmatch(link_id or ''):
+        return None
+    inputs = store.get(link_id)
+    if inputs is None:
+        return None
+    return inputs['name'], inputs['dob'], inputs['city'], inputs['premium'], inputs['scheme']
+
+
+# The reading behind a link (from the reading cache when possible), or None
+def resolve(link_id, templates, store, cache, selection='legacy'):
+    inputs = lookup(link_id, store)
+    if inputs is None:
+        return None
+    full_name, dob, city, is_premium, scheme = inputs
+    return cached_insights(full_name, dob, city, templates, is_premium, cache, selection, scheme)
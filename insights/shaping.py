@@ -0,0 +1,119 @@
+# Arabic shaping for PDF and image output.
+#
+# fpdf2 and Pillow draw the characters they are given one by one, left to
+# right, so raw Arabic comes out as disconnected letters in reverse order.
+# Text is therefore reshaped first (arabic_reshaper: every letter replaced
+# by its contextual presentation form, lam-alef ligatures) and then put in
+# visual order (python-bidi).
+#
+# Both steps cost far more than drawing, and the same template strings
+# come back in every document. Every text (template strings, names,
+# cities, composed sections, labels) is shaped on first use and kept in a
+# bounded LRU (INSIGHTS_SHAPING_CACHE_SIZE entries, default 4096), so
+# only the strings documents actually draw are shaped. Nothing walks the
+# whole corpus: a memory-mapped binary template file (insights/binfmt.py)
+# only decodes what is drawn.
+#
+# A paragraph has to be wrapped before it is reordered, or its lines come
+# out bottom line first: Shaper.lines() wraps the reshaped text in logical
+# order with the caller's width function, then reorders each line.
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _reshaper():
+    from arabic_reshaper import ArabicReshaper
+    
+    # ArabicReshaper means to compile its ligature regex once, but checks
+    # for it under the unmangled attribute name and so rebuilds it on every
+    # call, which costs ~20x the reshaping itself
+    class Reshaper(ArabicReshaper):
+        @property
+        def _ligatures_re(self):
+            try:
+                return self._compiled_ligatures_re
+            except AttributeError:
+                self._compiled_ligatures_re = ArabicReshaper._ligatures_re.fget(self)
+                return self._compiled_ligatures_re
+    
+    return Reshaper()
+
+
+# Contextual forms, still in logical order
+def reshape(text):
+    return _reshaper().reshape(text)
+
+
+# Visual order, line by line
+def reorder(text):
+    from bidi.algorithm import get_display
+    return '\n'.join(get_display(line) for line in text.split('\n'))
+
+
+def shape(text):
+    return reorder(reshape(text))
+
+
+class Shaper:
+    
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _cached(self, key, build):
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._lru[key] = value
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+        return value
+    
+    # (reshaped, visual) for `text`
+    def _entry(self, text):
+        def build():
+            reshaped = reshape(text)
+            return reshaped, reorder(reshaped)
+        return self._cached(text, build)
+    
+    # Reshaped text in logical order
+    def reshaped(self, text):
+        return self._entry(text)[0]
+    
+    # Reshaped text in visual order, ready to draw
+    def __call__(self, text):
+        return self._entry(text)[1]
+    
+    # `label` + `text` wrapped to `width` and put in visual order, as a
+    # tuple of lines. `measure(s)` is the drawn width of reshaped text s;
+    # `key` identifies the font and size it measures with.
+    def lines(self, text, width, measure, key, label=''):
+        def build():
+            wrapped = []
+            for paragraph in (self.reshaped(label) + self.reshaped(text)).split('\n'):
+                line = ''
+                for word in paragraph.split(' '):
+                    candidate = f"{line} {word}" if line else word
+                    if line and measure(candidate) > width:
+                        wrapped.append(line)
+                        line = word
+                    else:
+                        line = candidate
+                wrapped.append(line)
+            return tuple(reorder(line) for line in wrapped)
+        return self._cached((key, width, label, text), build)
+
+
+SHAPER = Shaper(int(os.environ.get('INSIGHTS_SHAPING_CACHE_SIZE', 4096)))
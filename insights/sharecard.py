@@ -0,0 +1,200 @@
+# Share cards: a reading rendered as a branded PNG or WebP image.
+#
+#   create_card(insights, is_premium, 'png') -> bytes
+#
+# Everything that does not depend on the reading is drawn once per
+# process: the background layer (gradient, header band, title, border,
+# footer) is rendered on first use and each card starts from a copy of it.
+# Text is drawn from a font atlas per size, every glyph of the font's
+# subset (insights.pdf.load_font) rasterized up front, so a line is a row
+# of glyph pastes instead of a FreeType run; finished line masks are kept
+# in a small LRU because template lines repeat from card to card. Text is
+# shaped and wrapped by insights.shaping like the PDF.
+#
+# Finished images are memoized by reading hash and format, bounded by
+# INSIGHTS_CARD_CACHE_BYTES (default 32 MiB).
+import io
+import math
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from insights.metrics import timed
+from insights.pdf import FONT_PATH as PDF_FONT_PATH
+from insights.pdf import PdfMemo, load_font, reading_hash
+from insights.shaping import SHAPER, shape
+
+# Same TTF as the PDF unless INSIGHTS_CARD_FONT is set: INSIGHTS_PDF_FONT,
+# else fonts/NotoNaskhArabic-Regular.ttf next to the package (not the CWD)
+FONT_PATH = os.environ.get('INSIGHTS_CARD_FONT') or PDF_FONT_PATH
+
+WIDTH, HEIGHT = 1080, 1350
+MARGIN = 70
+BAND_HEIGHT = 300
+
+CREAM = (253, 246, 227)
+CREAM_LIGHT = (255, 249, 240)
+RED = (193, 39, 45)
+ORANGE = (247, 147, 30)
+GOLD = (212, 175, 55)
+DARK = (75, 46, 46)
+TEXT = (51, 51, 51)
+WHITE = (255, 255, 255)
+
+TITLE = "الرسائل الشخصية المغربية 2026"
+FOOTER = "للترفيه فقط • تولد خوارزمياً"
+LINE_CACHE_SIZE = 512
+
+# (heading, insights key, premium only); every section is capped at
+# MAX_LINES wrapped lines so the card never overflows
+SECTIONS = (
+    ("نظرة على شخصيتك", 'personality', False),
+    ("نظرة على عام 2026", 'year_insight', False),
+    ("النصيحة الذهبية", 'golden_advice', True),
+)
+MAX_LINES = 4
+
+# name -> (Pillow format, MIME type, save options)
+FORMATS = {
+    'png': ('PNG', 'image/png', {'compress_level': 6}),
+    'webp': ('WEBP', 'image/webp', {'quality': 85, 'method': 2}),
+}
+
+
+# Every glyph of `charset` at one size, rasterized once. line(text)
+# returns the 'L' mask of one line of shaped text.
+class FontAtlas:
+    
+    def __init__(self, path, size, charset):
+        font = ImageFont.truetype(path, size)
+        ascent, descent = font.getmetrics()
+        self.size = size
+        self.ascent = ascent
+        self.height = ascent + descent
+        self.glyphs = {}
+        for code in sorted(charset):
+            char = chr(code)
+            advance = font.getlength(char)
+            x0, y0, x1, y1 = font.getbbox(char, anchor='ls')
+            mask = None
+            if x1 > x0 and y1 > y0:
+                mask = Image.new('L', (x1 - x0, y1 - y0))
+                ImageDraw.Draw(mask).text((-x0, -y0), char, font=font, fill=255, anchor='ls')
+            self.glyphs[char] = (mask, x0, y0, advance)
+        self.line = lru_cache(maxsize=LINE_CACHE_SIZE)(self._line)
+    
+    # Drawn width of `text`; characters missing from the font count as 0
+    def measure(self, text):
+        glyphs = self.glyphs
+        return sum(glyphs[c][3] for c in text if c in glyphs)
+    
+    def _line(self, text):
+        width = max(1, math.ceil(self.measure(text)))
+        line = Image.new('L', (width, self.height))
+        x = 0.0
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                continue
+            mask, x0, y0, advance = glyph
+            if mask is not None:
+                line.paste(mask, (round(x) + x0, self.ascent + y0), mask)
+            x += advance
+        return line
+
+
+@lru_cache(maxsize=None)
+def atlas(size, font_path=FONT_PATH):
+    subset_path, charset = load_font(font_path)
+    return FontAtlas(subset_path, size, charset)
+
+
+# Draw shaped lines right-aligned (or centered) starting at y; returns the next y
+def _draw_lines(image, lines, y, font, fill, align='right', spacing=1.35):
+    step = round(font.height * spacing)
+    for text in lines:
+        mask = font.line(text)
+        if align == 'center':
+            x = (WIDTH - mask.width) // 2
+        else:
+            x = WIDTH - MARGIN - mask.width
+        image.paste(fill, (x, y, x + mask.width, y + mask.height), mask)
+        y += step
+    return y
+
+
+def _gradient(size, start, end, horizontal=False):
+    steps = size[0] if horizontal else size[1]
+    strip = Image.new('RGB', (steps, 1) if horizontal else (1, steps))
+    strip.putdata([tuple(round(a + (b - a) * i / max(steps - 1, 1)) for a, b in zip(start, end))
+                   for i in range(steps)])
+    return strip.resize(size)
+
+
+# The part of every card that does not depend on the reading
+@lru_cache(maxsize=None)
+def background(font_path=FONT_PATH):
+    image = _gradient((WIDTH, HEIGHT), CREAM, CREAM_LIGHT)
+    image.paste(_gradient((WIDTH, BAND_HEIGHT), RED, ORANGE, horizontal=True), (0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, BAND_HEIGHT, WIDTH, BAND_HEIGHT + 8), fill=GOLD)
+    draw.rectangle((24, 24, WIDTH - 25, HEIGHT - 25), outline=GOLD, width=4)
+    for x in range(MARGIN, WIDTH - MARGIN + 1, 60):
+        draw.regular_polygon((x, HEIGHT - 120, 8), 4, fill=GOLD)
+    _draw_lines(image, [shape(TITLE)], 60, atlas(56, font_path), WHITE, 'center')
+    _draw_lines(image, [shape(FOOTER)], HEIGHT - 95, atlas(24, font_path), DARK, 'center')
+    return image
+
+
+@timed('render_card')
+def render_card(insights, is_premium, fmt='png', font_path=FONT_PATH, shaper=SHAPER):
+    pil_format, _, options = FORMATS[fmt]
+    image = background(font_path).copy()
+    
+    name = atlas(44, font_path)
+    _draw_lines(image, [shaper(str(insights.get('name', '')))], 170, name, WHITE, 'center')
+    
+    heading = atlas(34, font_path)
+    body = atlas(30, font_path)
+    width = WIDTH - 2 * MARGIN
+    y = BAND_HEIGHT + 50
+    for title, key, premium_only in SECTIONS:
+        if premium_only and not is_premium:
+            continue
+        y = _draw_lines(image, [shaper(title)], y, heading, RED)
+        lines = shaper.lines(str(insights.get(key, '')), width, body.measure, ('card', font_path, body.size))
+        y = _draw_lines(image, lines[:MAX_LINES], y, body, TEXT) + 30
+    
+    if is_premium:
+        lucky = f"الرقم السعيد: {insights.get('lucky_number', '')} • اليوم السعيد: {insights.get('lucky_day', '')}"
+        _draw_lines(image, [shaper(lucky)], HEIGHT - 190, heading, DARK, 'center')
+    
+    out = io.BytesIO()
+    image.save(out, pil_format, **options)
+    return out.getvalue()
+
+
+_memo = PdfMemo(int(os.environ.get('INSIGHTS_CARD_CACHE_BYTES', 32 * 1024 * 1024)))
+
+
+# Share card as bytes (memoized by reading hash and format)
+@timed('create_card')
+def create_card(insights, is_premium, fmt='png', memo=_memo):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown card format {fmt!r}")
+    key = f"{reading_hash(insights, is_premium)}:{fmt}"
+    data = memo.get(key)
+    if data is None:
+        data = render_card(insights, is_premium, fmt)
+        memo.put(key, data)
+    return data
+
+
+def card_mime_type(fmt):
+    return FORMATS[fmt][1]
+
+
+# Download name of a share card
+def card_filename(insights, fmt='png'):
+    return f"الرسائل_الشخصية_{insights['name']}_2026.{fmt}"
@@ -0,0 +1,85 @@
+# Hot-reloadable template store.
+#
+# TemplateStore.current() returns the compiled TemplateIndex for a
+# templates file and picks up edits without a restart: at most once per
+# `check_interval` seconds it stats the file, and when size or mtime
+# changed it re-reads it and recompiles only the categories that changed
+# (compile_templates(raw, previous)). The new index is swapped in with a
+# single reference assignment. Generations already running keep the index
+# they started with, and readers never take a lock. Every index carries
+# its content-hash `version`, which goes into the reading cache keys, so
+# cached readings from old templates are never served for new ones.
+#
+# The path may also be a binary template file (insights/binfmt.py); a
+# rebuilt file is re-mapped the same way a JSON file is re-parsed.
+import logging
+import os
+import threading
+import time
+
+from insights.metrics import span
+from insights.templates import changed_categories, load_template_index
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateStore:
+    
+    def __init__(self, path='templates.json', check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stat = self._file_stat()
+        self._index = load_template_index(path)
+        self._checked_at = time.monotonic()
+    
+    def _file_stat(self):
+        st = os.stat(self.path)
+        return (st.st_size, st.st_mtime_ns)
+    
+    @property
+    def version(self):
+        return self._index.version
+    
+    # The current index; reloads first if the file changed
+    def current(self):
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._index
+    
+    # Re-read the file if it changed; returns True when a new index was swapped in
+    def reload(self, force=False):
+        # Only one thread recompiles; the others keep using the current index
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                stat = self._file_stat()
+                if stat == self._stat and not force:
+                    return False
+                with span('templates.reload'):
+                    index = load_template_index(self.path, self._index)
+            except Exception as e:
+                # Missing, half-written or malformed file: keep serving the last good index
+                logger.warning("templates reload failed, keeping version %s: %s", self._index.version, e)
+                return False
+            
+            previous = self._index
+            self._stat = stat
+            if index.version == previous.version:
+                return False
+            self._index = index
+            logger.info("templates %s -> %s, recompiled %s", previous.version, index.version,
+                        ', '.join('/'.join(key) for key in changed_categories(previous, index)) or 'nothing')
+            return True
+        finally:
+            self._lock.release()
+
+
+# Store for INSIGHTS_TEMPLATES (templates.json or a compiled .bin file)
+def store_from_env():
+    return TemplateStore(
+        os.environ.get('INSIGHTS_TEMPLATES', 'templates.json'),
+        check_interval=float(os.environ.get('INSIGHTS_TEMPLATES_CHECK', 1.0)),
+    )
@@ -0,0 +1,116 @@
+# Compiled, immutable view of templates.json.
+#
+# load_templates() used to hand the nested JSON dicts to the generator,
+# which walked templates.get(section).get(category) for every draw. The
+# index below is built once per process: every category becomes an
+# interned tuple at a fixed ordinal, sizes are precomputed, and the free
+# and premium draw plans are resolved ahead of time. The raw dicts are
+# dropped after compiling.
+import hashlib
+import json
+import sys
+from collections import namedtuple
+
+from insights.compose import compile_fragments
+from insights.engine import FREE_CATEGORIES, PREMIUM_CATEGORIES, read_templates
+
+SECTION_TYPES = ('free_sections', 'premium_sections')
+
+
+# namedtuple keeps the index immutable and picklable, so it can be shared
+# through st.cache_resource and shipped to process-pool workers.
+# `version` is a content hash of the templates and belongs in every cache
+# key derived from a reading.
+class TemplateIndex(namedtuple('TemplateIndex', 'version items sizes ordinals free_plan premium_plan')):
+    __slots__ = ()
+    
+    # Items of one category, or () when the category does not exist
+    def lookup(self, section_type, category):
+        ordinal = self.ordinals.get((section_type, category))
+        if ordinal is None:
+            return ()
+        return self.items[ordinal]
+    
+    # (category, items) pairs in draw order, see engine.category_plan()
+    def plan(self, is_premium=False):
+        return self.premium_plan if is_premium else self.free_plan
+
+
+# Stable content hash of the parsed templates (key order does not matter)
+def templates_version(raw):
+    canonical = json.dumps(raw, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+# Assemble a TemplateIndex from ((section_type, category), items) pairs
+#
+# Items can be any sequence (tuples here, lazily decoded views of a
+# binary file in insights/binfmt.py). Categories with `fragments` are
+# composed (insights/compose.py): the plans carry their compiled
+# Composition instead of the flat list, which lookup() still returns.
+def make_index(version, categories, fragments=None):
+    items = []
+    ordinals = {}
+    for key, entries in categories:
+        ordinals[key] = len(items)
+        items.append(entries)
+    compositions = compile_fragments(fragments)
+    
+    def resolve(section_type, category):
+        if category in compositions:
+            return (category, compositions[category])
+        ordinal = ordinals.get((section_type, category))
+        return (category, items[ordinal] if ordinal is not None else ())
+    
+    free_plan = tuple(resolve('free_sections', c) for c in FREE_CATEGORIES)
+    premium_plan = free_plan + tuple(resolve('premium_sections', c) for c in PREMIUM_CATEGORIES)
+    
+    return TemplateIndex(
+        version=version,
+        items=tuple(items),
+        sizes=tuple(len(entries) for entries in items),
+        ordinals=ordinals,
+        free_plan=free_plan,
+        premium_plan=premium_plan,
+    )
+
+
+# Compile the parsed templates.json dict into a TemplateIndex
+#
+# With `previous`, categories whose entries did not change reuse the
+# previous index's tuples as-is; only changed categories are re-interned.
+#
+# A file of the wrong shape (a section that is not an object, a category
+# that is not a list of strings) raises ValueError, like unparsable JSON,
+# so TemplateStore keeps serving the last good index.
+def compile_templates(raw, previous=None):
+    if not isinstance(raw, dict):
+        raise ValueError("templates must be a JSON object")
+    categories = []
+    for section_type in SECTION_TYPES:
+        sections = raw.get(section_type, {})
+        if not isinstance(sections, dict):
+            raise ValueError(f"{section_type} must be an object")
+        for category, entries in sections.items():
+            if not isinstance(entries, list) or not all(isinstance(entry, str) for entry in entries):
+                raise ValueError(f"{section_type}.{category} must be a list of strings")
+            compiled = previous.lookup(section_type, category) if previous is not None else ()
+            if not compiled or list(compiled) != entries:
+                compiled = tuple(sys.intern(entry) for entry in entries)
+            categories.append(((section_type, category), compiled))
+    return make_index(templates_version(raw), categories, raw.get('fragments'))
+
+
+# Read and compile a templates file in one step. Files written by
+# `python -m insights.binfmt` are memory-mapped instead of parsed.
+def load_template_index(path='templates.json', previous=None):
+    from insights.binfmt import is_binary, load_binary_index
+    if is_binary(path):
+        return load_binary_index(path)
+    return compile_templates(read_templates(path), previous)
+
+
+# (section_type, category) pairs whose items differ between two indexes
+def changed_categories(old, new):
+    keys = set(old.ordinals) | set(new.ordinals)
+    return sorted(key for key in keys if old.lookup(*key) is not new.lookup(*key))
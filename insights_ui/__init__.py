@@ -0,0 +1,8 @@
+# Streamlit front end of the app: page sections, actions and the
+# per-process resources they share.
+#
+# app.py is only the entry script. Streamlit re-executes it on every
+# widget interaction, but modules it imports stay in sys.modules, so the
+# definitions, HTML literals and imports here are loaded once per process
+# and a rerun only runs page.main(). The engine stays in `insights`,
+# which never imports streamlit.
@@ -0,0 +1,128 @@
+# Copy, PDF export and share actions under a reading.
+import time
+
+import streamlit as st
+
+from insights.export import export_text, whatsapp_link
+from insights.jobs import QueueFull
+from insights.pdf import pdf_filename, reading_hash
+from insights.permalink import register
+from insights.sharecard import card_filename, create_card
+from insights_ui.resources import get_permalink_store, get_render_pool
+
+
+# Poll the reading's PDF job: notice + rerun while rendering, download
+# button once the bytes are ready (the bytes are then kept with the reading)
+def render_pdf_download(reading):
+    if 'pdf_data' not in reading:
+        job = reading.get('pdf_job')
+        if job is None:
+            return
+        
+        try:
+            pdf_data = get_render_pool().poll(job)
+        except KeyError:
+            del reading['pdf_job']
+            return
+        except FileNotFoundError:
+            del reading['pdf_job']
+            st.error("خط PDF ملقاهوش. حدد INSIGHTS_PDF_FONT لملف TTF فيه الحروف العربية.")
+            return
+        
+        if pdf_data is None:
+            st.info("⏳ كنوجدو PDF ديالك...")
+            time.sleep(0.3)
+            st.rerun()
+        reading['pdf_data'] = pdf_data
+    
+    # Raw bytes are served by Streamlit's media endpoint;
+    # only a short URL travels over the websocket
+    st.download_button(
+        "⬇️ تحميل PDF",
+        data=reading['pdf_data'],
+        file_name=pdf_filename(reading['insights']),
+        mime="application/pdf",
+        use_container_width=True
+    )
+
+
+# Share card image with a download button (rendered once per reading
+# hash, see insights/sharecard.py)
+def render_share_card(reading, is_premium):
+    try:
+        card = create_card(reading['insights'], is_premium, 'png')
+    except FileNotFoundError:
+        st.error("خط الصورة ملقاهوش. حدد INSIGHTS_CARD_FONT لملف TTF فيه الحروف العربية.")
+        return
+    st.image(card, use_column_width=True)
+    st.download_button(
+        "🖼️ تحميل الصورة",
+        data=card,
+        file_name=card_filename(reading['insights']),
+        mime="image/png",
+        use_container_width=True
+    )
+
+
+# Text export of a reading; its hash is computed once and kept with it
+def reading_text(reading, is_premium, fmt):
+    if 'digest' not in reading:
+        reading['digest'] = reading_hash(reading['insights'], is_premium)
+    return export_text(reading['insights'], is_premium, fmt, reading['digest'])
+
+
+# The reading's permalink, registered on the first share only (nothing
+# about the user is stored before that), and put in the page URL so the
+# share buttons send it. A shared view already has its link.
+def share_link(reading):
+    if 'link' not in reading:
+        full_name, dob, city, is_premium = reading['key']
+        reading['link'] = register(full_name, dob, city, is_premium, get_permalink_store())
+    st.experimental_set_query_params(r=reading['link'])
+
+
+# Copy, PDF export and share buttons under a reading
+def render_actions(reading, is_premium):
+    insights = reading['insights']
+    
+    # Action buttons
+    st.markdown("---")
+    st.markdown('<h3 style="text-align: center; color: #4B2E2E;">📤 مشاركة وحفظ الرسائل</h3>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        # Copy to clipboard (text exported on first use, cached by reading hash)
+        if st.button("📋 نسخ النص", use_container_width=True):
+            st.code(reading_text(reading, is_premium, 'plain'), language="text")
+            st.success("✅ تم نسخ النص بنجاح! يمكنك لصقه في أي مكان.")
+    
+    with col2:
+        # Export as PDF
+        if 'pdf_data' not in reading and 'pdf_job' not in reading:
+            if st.button("📄 تصدير PDF", use_container_width=True):
+                pool = get_render_pool()
+                try:
+                    reading['pdf_job'] = pool.submit(insights, is_premium)
+                except QueueFull:
+                    st.warning("⏳ بزاف ديال الطلبات دابا. عاود جرب من بعد شوية.")
+        render_pdf_download(reading)
+    
+    with col3:
+        # Share button
+        if st.button("📤 مشاركة", use_container_width=True):
+            share_link(reading)
+            share_text = f"جربت تطبيق الرسائل الشخصية المغربية 2026 وحصلت على رسائل شخصية رائعة!"
+            st.markdown(f"""
+            <div style="text-align: center; padding: 10px;">
+                <p style="color: #4B2E2E;">شارك عبر:</p>
+                <div class="social-share">
+                    <div class="social-icon" onclick="navigator.share({{title: 'رسائلي الشخصية', text: '{share_text}', url: window.location.href}})">📱</div>
+                    <div class="social-icon" onclick="window.open('https://wa.me/?text=' + encodeURIComponent('{share_text} ' + window.location.href))">💬</div>
+                    <div class="social-icon" onclick="window.open('https://twitter.com/intent/tweet?text=' + encodeURIComponent('{share_text} ' + window.location.href))">🐦</div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            st.link_button("💬 شارك الرسائل فواتساب", whatsapp_link(reading_text(reading, is_premium, 'whatsapp')),
+                           use_container_width=True)
+            render_share_card(reading, is_premium)
@@ -0,0 +1,151 @@
+# Static page sections: stylesheet, header, input form and footer.
+import os
+from datetime import datetime
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from insights.assets import stylesheet_tag
+
+
+# Inject custom CSS with corrected colors
+# The stylesheet lives in static/app.css and is inlined minified
+# (static/app.min.css, ~6.5 KB); Streamlit's static file server only
+# serves the fonts, which the browser caches.
+def inject_custom_css():
+    st.markdown(stylesheet_tag(), unsafe_allow_html=True)
+    if os.environ.get('INSIGHTS_PAINT_TIMING'):
+        report_paint_timing()
+
+
+# Log first paint / first contentful paint and when the stylesheet and
+# fonts finished loading to the browser console (INSIGHTS_PAINT_TIMING=1)
+def report_paint_timing():
+    components.html("""
+    <script>
+        const perf = window.parent.performance;
+        const report = () => {
+            const paints = perf.getEntriesByType('paint').map(e => `${e.name}=${Math.round(e.startTime)}ms`);
+            const assets = perf.getEntriesByType('resource')
+                .filter(e => /app\/static\/|fonts\.g/.test(e.name))
+                .map(e => `${e.name.split('/').pop().split('?')[0]}=${Math.round(e.responseEnd)}ms`);
+            console.log('[insights] paint', paints.join(' '), '| assets', assets.join(' '));
+        };
+        if (window.parent.document.readyState === 'complete') report();
+        else window.parent.addEventListener('load', report);
+    </script>
+    """, height=0)
+
+
+# Moroccan-themed header
+def render_header():
+    st.markdown("""
+    <div class="main-header">
+        <div class="logo-area">🌿✨</div>
+        <h1 style="font-size: 3rem; margin: 10px 0; text-shadow: 2px 2px 8px rgba(0,0,0,0.3);">الرسائل الشخصية المغربية 2026</h1>
+        <p style="font-size: 1.4rem; opacity: 0.95; margin-bottom: 10px; color: white !important;">رسائل شخصية تولد خصيصاً لك بالدارجة المغربية</p>
+        <p style="font-size: 1rem; opacity: 0.9; background: rgba(255,255,255,0.2); padding: 5px 15px; border-radius: 20px; display: inline-block; color: white !important;">
+            ⚠️ للترفيه فقط • تولد خوارزمياً • لا تعتمد على أي مبادئ علمية
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# Name / birth date / city inputs and version picker
+def render_inputs():
+    # Main content
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("### 📝 أدخل معلوماتك الشخصية")
+        
+        full_name = st.text_input(
+            "**الاسم الكامل**",
+            placeholder="اكتب الاسم الكامل بالعربية",
+            help="الاسم الكامل كما تحب أن يناديك به أحباؤك"
+        )
+        
+        col_a, col_b = st.columns(2)
+        with col_a:
+            dob = st.date_input(
+                "**تاريخ الميلاد**",
+                min_value=datetime(1900, 1, 1),
+                max_value=datetime(2100, 12, 31),
+                help="اختر تاريخ ميلادك"
+            )
+            dob_str = dob.strftime("%Y-%m-%d")
+        
+        with col_b:
+            city = st.text_input(
+                "**مدينتك**",
+                placeholder="المدينة التي تعيش فيها",
+                help="أي مدينة مغربية أو عالمية"
+            )
+    
+    with col2:
+        st.markdown("### ⭐ اختر النسخة")
+        
+        is_premium = st.checkbox(
+            "💎 **النسخة الكاملة**",
+            help="تحصل على كل الرسائل: نصائح، تحذيرات، فرص، نشاطات، وتحديات"
+        )
+        
+        if is_premium:
+            st.success("""
+            **✅ النسخة الكاملة مفعلة!**
+            
+            ستتلقى:
+            • النصيحة الذهبية
+            • التحدي والتحذير
+            • الفرصة غير المتوقعة
+            • نشاط مقترح للشهر
+            • تحدي تحفيزي
+            • نكتة مغربية
+            • والمزيد...
+            """)
+        else:
+            st.info("""
+            **🆓 النسخة المجانية**
+            
+            تحصل على:
+            • نظرة على شخصيتك
+            • نظرة على عام 2026
+            """)
+        
+        # Social sharing
+        st.markdown("### 🤝 شارك التطبيق")
+        st.markdown("""
+        <div class="social-share">
+            <div class="social-icon" onclick="navigator.share({title: 'الرسائل الشخصية المغربية', text: 'جرب تطبيق الرسائل الشخصية المغربية 2026!', url: window.location.href})">📱</div>
+            <div class="social-icon" onclick="window.open('https://wa.me/?text=' + encodeURIComponent('جرب تطبيق الرسائل الشخصية المغربية 2026! ' + window.location.href))">💬</div>
+            <div class="social-icon" onclick="window.open('https://twitter.com/intent/tweet?text=' + encodeURIComponent('جرب تطبيق الرسائل الشخصية المغربية 2026! ' + window.location.href))">🐦</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    return full_name, dob_str, city, is_premium
+
+
+# Disclaimer and footer
+def render_footer():
+    # Disclaimer and legal text
+    st.markdown("---")
+    st.markdown("""
+    <div class="disclaimer-box">
+        <h4 style="color: #4B2E2E !important;">📜 ملاحظات قانونية وأخلاقية</h4>
+        <p><strong>⚠️ هاد المحتوى للترفيه فقط:</strong> كل الرسائل تولد خوارزمياً باستخدام Python ولا تعتمد على أي مبادئ علمية، تنبؤية، فلكية، أو روحية.</p>
+        <p><strong>🔒 خصوصيتك محمية:</strong> لا يتم حفظ أو تخزين أو مشاركة أي من معلوماتك الشخصية، إلا إذا ضغطت على «📤 مشاركة»: حينها يُحفظ اسمك وتاريخ ميلادك ومدينتك مع رابط المشاركة، حتى يتمكن من تبعث له الرابط من فتح رسائلك.</p>
+        <p><strong>🎯 الغرض من التطبيق:</strong> تقديم رسائل إيجابية وتحفيزية باللهجة المغربية للترفيه والتشجيع فقط.</p>
+        <p><strong>🚫 لا للاعتماد:</strong> لا تعتمد على هذه الرسائل لأخذ قرارات مهمة في حياتك، العمل، الصحة، أو العلاقات.</p>
+        <p style="font-size: 0.9em; margin-top: 15px; opacity: 0.7; color: #4B2E2E !important;">© 2024 الرسائل الشخصية المغربية - تطوير تقني للترفيه الإيجابي</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Footer
+    st.markdown("---")
+    st.markdown("""
+    <div style="text-align: center; color: #4B2E2E; padding: 25px;">
+        <p style="font-size: 1.1em;">🌿 تم التطوير بكل ❤️ لخدمة الثقافة واللغة المغربية</p>
+        <p style="font-size: 0.9em; opacity: 0.8;">استمتع برسائل إيجابية وترفيهية بالدارجة المغربية المحببة</p>
+        <p style="margin-top: 20px; font-size: 0.8em; opacity: 0.6;">الإصدار 3.0 | يدعم جميع الأجهزة | تصميم مغربي أصيل</p>
+    </div>
+    """, unsafe_allow_html=True)
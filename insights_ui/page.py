@@ -0,0 +1,107 @@
+# One run of the page (called by app.py on every rerun).
+import streamlit as st
+
+from insights.cache import cached_insights
+from insights.cards import render_results
+from insights.metrics import span
+from insights.permalink import lookup
+from insights_ui.actions import render_actions
+from insights_ui.layout import inject_custom_css, render_footer, render_header, render_inputs
+from insights_ui.resources import get_permalink_store, get_reading_cache, load_templates
+
+
+# The reading behind a permalink (?r=<id>), kept in the session while the
+# link stays open; None when the link is unknown
+def load_shared(link_id, templates):
+    shared = st.session_state.get('shared')
+    if shared is not None and shared['link'] == link_id:
+        return shared
+    inputs = lookup(link_id, get_permalink_store())
+    if inputs is None:
+        return None
+    full_name, dob, city, is_premium, scheme = inputs
+    insights = cached_insights(full_name, dob, city, templates, is_premium, get_reading_cache(), scheme=scheme)
+    shared = st.session_state['shared'] = {
+        'link': link_id,
+        'premium': is_premium,
+        'insights': insights,
+        'html': render_results(insights, is_premium),
+    }
+    return shared
+
+
+# A shared reading, shown without the form
+def render_shared(shared):
+    st.markdown(shared['html'], unsafe_allow_html=True)
+    render_actions(shared, shared['premium'])
+    st.markdown("---")
+    if st.button("✨ جرب بمعلوماتك", use_container_width=True, type="primary"):
+        st.experimental_set_query_params()
+        del st.session_state['shared']
+        st.rerun()
+
+
+def main():
+    # Inject custom CSS with corrected colors
+    with span('render.css'):
+        inject_custom_css()
+    
+    # Load templates
+    with span('load_templates'):
+        templates = load_templates()
+    
+    with span('render.header'):
+        render_header()
+    
+    # A permalink opens its reading straight from the cache, no form round
+    # trip; once shared, the page's own reading carries its link in the URL
+    # as well
+    link_id = st.experimental_get_query_params().get('r', [None])[0]
+    reading = st.session_state.get('reading')
+    if link_id and (reading is None or reading.get('link') != link_id):
+        with span('load_shared'):
+            shared = load_shared(link_id, templates)
+        if shared is not None:
+            with span('render.shared'):
+                render_shared(shared)
+            with span('render.footer'):
+                render_footer()
+            return
+        st.warning("🔗 هاد الرابط ما بقاش صالح. دخل معلوماتك من جديد.")
+    
+    with span('render.inputs'):
+        full_name, dob_str, city, is_premium = render_inputs()
+    
+    # The current reading survives reruns triggered by the copy, export and
+    # share buttons; it is dropped as soon as an input changes
+    reading_key = (full_name, dob_str, city, is_premium)
+    if reading is not None and reading['key'] != reading_key:
+        del st.session_state['reading']
+        reading = None
+        st.experimental_set_query_params()
+    
+    # Generate button
+    if st.button("✨ عطيني الرسالة ديالي", use_container_width=True, type="primary"):
+        if full_name and city:
+            # Generate insights
+            with span('generate'):
+                insights = cached_insights(full_name, dob_str, city, templates, is_premium, get_reading_cache())
+                reading = st.session_state['reading'] = {
+                    'key': reading_key,
+                    'insights': insights,
+                    'html': render_results(insights, is_premium),
+                }
+        else:
+            st.error("⛔ من فضلك، أدخل كل المعلومات المطلوبة")
+    
+    if reading is not None:
+        # Display insights (one element for the whole result grid)
+        with span('render.results'):
+            st.markdown("---")
+            st.markdown(reading['html'], unsafe_allow_html=True)
+        
+        with span('render.actions'):
+            render_actions(reading, is_premium)
+    
+    with span('render.footer'):
+        render_footer()
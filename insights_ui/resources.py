@@ -0,0 +1,57 @@
+# Process-wide resources shared by every session (st.cache_resource).
+import os
+
+import streamlit as st
+
+from insights.cache import cache_from_env
+from insights.jobs import pool_from_env
+from insights.metrics import serve_metrics
+from insights.permalink import permalink_store_from_env
+from insights.store import store_from_env
+from insights.templates import compile_templates
+
+
+# One hot-reloading template store per process; edits to templates.json
+# (or INSIGHTS_TEMPLATES) are picked up on the next rerun without a restart
+@st.cache_resource
+def get_template_store():
+    return store_from_env()
+
+
+# The compiled index for this run (shared, immutable; see insights/store.py)
+def load_templates():
+    try:
+        return get_template_store().current()
+    except FileNotFoundError:
+        st.error("فايل templates.json ملقاهوش. تاكد منو فالمكان الصحيح.")
+        return compile_templates({})
+
+
+# Process-wide cache of generated readings (see insights/cache.py for the
+# INSIGHTS_CACHE_* environment variables)
+@st.cache_resource
+def get_reading_cache():
+    return cache_from_env()
+
+
+# Permalinks of shared readings (INSIGHTS_PERMALINK_DB, see
+# insights/permalink.py)
+@st.cache_resource
+def get_permalink_store():
+    return permalink_store_from_env()
+
+
+# Shared background PDF renderer (see insights/jobs.py for the
+# INSIGHTS_PDF_* environment variables)
+@st.cache_resource
+def get_render_pool():
+    return pool_from_env()
+
+
+# Prometheus endpoint for this process's span histograms, started once
+# when INSIGHTS_METRICS_PORT is set (see insights/metrics.py)
+@st.cache_resource
+def start_metrics_endpoint():
+    port = os.environ.get('INSIGHTS_METRICS_PORT')
+    if port:
+        return serve_metrics(int(port))
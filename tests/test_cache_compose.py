@@ -0,0 +1,97 @@
+# Cached readings of composed sections must match uncached generation.
+#
+#   python -m pytest tests
+#
+# cached_insights() stores composed sections with their {name}/{city}
+# slots open and fills them on the way out, so a cache hit for one input
+# must read exactly like generate_insights() for that input, including
+# for inputs that share a seed but not a name or city as typed.
+import os
+import unittest
+
+from insights.cache import INPUT_FIELDS, ReadingCache, cached_insights
+from insights.compose import CONTEXT_MARKERS
+from insights.engine import SEED_SCHEMES, SELECTION_MODES, generate_insights, generate_seed
+from insights.templates import compile_templates, read_templates
+
+FRAGMENTS = {
+    'slots': {'month': ['يناير', 'فبراير', 'مارس', 'أبريل']},
+    'sections': {
+        'personality': {
+            'parts': {
+                'opening': ['{name}،', ['أ {name}،', 3]],
+                'body': ['نتا واحد كيحب {city}.', 'الناس ف{city} كيعرفوك.', 'هاد {month} ديالك.'],
+            },
+        },
+        'golden_advice': {
+            'parts': {
+                'opening': ['ف{city}،', ['هاد {month}،', 2]],
+                'closing': ['تهلا ف راسك يا {name}.', 'ما تنساش {city}.'],
+            },
+            'separator': ' — ',
+        },
+    },
+}
+
+# Inputs that share a seed under the given scheme but differ as typed
+SHARED_SEEDS = {
+    1: (('Ali', '2000-01-011', 'Fes'), ('Ali', '2000-01-01', '1Fes')),
+    3: (('أمين', '1995-03-07', 'Casablanca'), ('امين', '1995-3-7', 'الدار البيضاء')),
+}
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates.json')
+
+
+def _reading(insights):
+    return {k: v for k, v in insights.items() if k != 'generated_at'}
+
+
+class CachedCompositionTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        raw = read_templates(TEMPLATES)
+        raw['fragments'] = FRAGMENTS
+        cls.templates = compile_templates(raw)
+    
+    def assert_same_reading(self, row, is_premium, cache, selection, scheme):
+        cached = cached_insights(*row, self.templates, is_premium, cache, selection, scheme)
+        expected = generate_insights(*row, self.templates, is_premium, selection, scheme=scheme)
+        self.assertEqual(_reading(cached), _reading(expected))
+        for marker in CONTEXT_MARKERS.values():
+            self.assertNotIn(marker, ''.join(str(v) for v in cached.values()))
+    
+    def test_miss_and_hit_match_generation(self):
+        row = ('فاطمة الزهراء', '1988-12-30', 'مراكش')
+        for scheme in SEED_SCHEMES:
+            for selection in SELECTION_MODES:
+                for is_premium in (False, True):
+                    with self.subTest(scheme=scheme, selection=selection, premium=is_premium):
+                        cache = ReadingCache()
+                        self.assert_same_reading(row, is_premium, cache, selection, scheme)
+                        self.assert_same_reading(row, is_premium, cache, selection, scheme)
+                        self.assertEqual(cache.hits, 1)
+    
+    def test_shared_seed_keeps_each_input(self):
+        for scheme, (first, second) in SHARED_SEEDS.items():
+            self.assertEqual(generate_seed(*first, scheme), generate_seed(*second, scheme))
+            for selection in SELECTION_MODES:
+                with self.subTest(scheme=scheme, selection=selection):
+                    cache = ReadingCache()
+                    self.assert_same_reading(first, True, cache, selection, scheme)
+                    self.assert_same_reading(second, True, cache, selection, scheme)
+                    self.assertEqual(cache.hits, 1)
+                    self.assertEqual(cached_insights(*second, self.templates, True, cache, selection, scheme)['city'],
+                                     second[2])
+    
+    def test_input_fields_are_not_cached(self):
+        cache = ReadingCache()
+        cached_insights('علي', '1990-01-01', 'فاس', self.templates, True, cache)
+        (payload, _), = cache._entries.values()
+        self.assertFalse(set(INPUT_FIELDS) & set(payload))
+        self.assertNotIn('علي', str(payload))
+        self.assertNotIn('فاس', str(payload))
+
+
+if __name__ == '__main__':
+    unittest.main()